@@ -0,0 +1,61 @@
+# benchmarks/composite_query_benchmark.py
+#
+# CompositeMemoryStore.query latency with both sub-stores called one after
+# the other versus the concurrent fan-out, using stores that sleep to
+# simulate backend latency.
+#
+#   python benchmarks/composite_query_benchmark.py [n_queries] [semantic_ms] [recency_ms]
+
+import sys
+import time
+
+from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.stores.composite_memory import CompositeMemoryStore
+
+
+class SleepyStore(MemoryStore):
+    """Answers every query with the same hits after `latency` seconds."""
+
+    def __init__(self, latency: float, hits):
+        self.latency = latency
+        self.hits = hits
+
+    def add(self, key, value, metadata=None):
+        pass
+
+    def query(self, query, top_k=5):
+        time.sleep(self.latency)
+        return self.hits[:top_k]
+
+    def summarize(self):
+        pass
+
+
+def main():
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    semantic_s = (float(sys.argv[2]) if len(sys.argv) > 2 else 30.0) / 1000
+    recency_s = (float(sys.argv[3]) if len(sys.argv) > 3 else 10.0) / 1000
+
+    semantic = SleepyStore(semantic_s, [(f"s{i}", {"text": f"s{i}"}) for i in range(10)])
+    recency = SleepyStore(recency_s, [(f"r{i}", f"r{i}", {}) for i in range(10)])
+    store = CompositeMemoryStore(recency, semantic)
+
+    print(f"{n_queries} queries, semantic {semantic_s * 1000:.0f} ms, recency {recency_s * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    for _ in range(n_queries):
+        store.query_semantic("q")
+        store.query_recency()
+    sequential = (time.perf_counter() - start) / n_queries
+    print(f"sequential: {sequential * 1000:.2f} ms/query")
+
+    start = time.perf_counter()
+    for _ in range(n_queries):
+        store.query("q")
+    fanned = (time.perf_counter() - start) / n_queries
+    print(f"fan-out:    {fanned * 1000:.2f} ms/query ({sequential / fanned:.2f}x)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
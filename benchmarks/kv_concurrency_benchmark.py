@@ -0,0 +1,66 @@
+# benchmarks/kv_concurrency_benchmark.py
+#
+# Read throughput with 1..N reader threads while one thread keeps writing:
+# the single-connection KeyValueStore against PooledKeyValueStore.
+#
+#   python benchmarks/kv_concurrency_benchmark.py [reads_per_thread] [max_threads]
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+from orchestrai.memory.stores.pooled_key_value_store import PooledKeyValueStore
+
+N_KEYS = 10_000
+
+
+def measure(store, n_threads, reads):
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            store.set(f"w{i % 100}", str(i))
+            i += 1
+
+    def reader(seed):
+        for i in range(reads):
+            store.get(f"k{(seed * 7919 + i) % N_KEYS}")
+
+    w = threading.Thread(target=writer)
+    w.start()
+    threads = [threading.Thread(target=reader, args=(t,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    w.join()
+    return n_threads * reads / elapsed
+
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    max_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"reads/s with one concurrent writer, {reads} reads per thread")
+    print(f"{'threads':>7} {'single conn':>12} {'pooled':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        single = KeyValueStore(os.path.join(tmp, "single.db"), durability="wal")
+        pooled = PooledKeyValueStore(os.path.join(tmp, "pooled.db"))
+        for store in (single, pooled):
+            store.set_many((f"k{i}", f"value {i}") for i in range(N_KEYS))
+        n = 1
+        while n <= max_threads:
+            print(f"{n:>7} {measure(single, n, reads):>12,.0f} {measure(pooled, n, reads):>12,.0f}")
+            n *= 2
+        single.close()
+        pooled.close()
+
+
+if __name__ == "__main__":
+    main()
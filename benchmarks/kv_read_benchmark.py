@@ -0,0 +1,49 @@
+# benchmarks/kv_read_benchmark.py
+#
+# Read latency of a file-backed KeyValueStore for a per-turn fact lookup:
+# uncached get, cached get, and get_many for the whole batch. Cached reads
+# run once with strict data_version checks and once checking every 50ms.
+#
+#   python benchmarks/kv_read_benchmark.py [n_turns] [keys_per_turn]
+
+import os
+import sys
+import tempfile
+import time
+
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+
+N_FACTS = 50_000
+
+
+def per_turn(label, store, turns, fn):
+    start = time.perf_counter()
+    for _ in range(turns):
+        fn(store)
+    elapsed = time.perf_counter() - start
+    stats = store.stats()
+    ratio = f"{stats['hit_ratio']:.2f}" if store.cache_size else "-"
+    print(f"{label:<28} {elapsed / turns * 1e6:>10.1f} {ratio:>9}")
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    per = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    hot = [f"user.fact.{i}" for i in range(per)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "kv.db")
+        KeyValueStore(path).set_many((f"user.fact.{i}", f"value {i}") for i in range(N_FACTS))
+
+        print(f"{turns} turns reading {per} hot keys from {N_FACTS} facts")
+        print(f"{'mode':<28} {'us/turn':>10} {'hit ratio':>9}")
+        per_turn("get, no cache", KeyValueStore(path), turns, lambda s: [s.get(k) for k in hot])
+        per_turn("get_many, no cache", KeyValueStore(path), turns, lambda s: s.get_many(hot))
+        for check, label in ((0, "strict"), (50, "check 50ms")):
+            cached = lambda: KeyValueStore(path, cache_size=1024, version_check_ms=check)
+            per_turn(f"get, cache, {label}", cached(), turns, lambda s: [s.get(k) for k in hot])
+            per_turn(f"get_many, cache, {label}", cached(), turns, lambda s: s.get_many(hot))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/kv_scan_benchmark.py
+#
+# Listing one tenant's keys in a multi-tenant KeyValueStore: a namespaced
+# prefix scan against loading every key and filtering in Python.
+#
+#   python benchmarks/kv_scan_benchmark.py [n_tenants] [keys_per_tenant]
+
+import os
+import sys
+import tempfile
+import time
+
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+
+
+def main():
+    tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    per = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = KeyValueStore(os.path.join(tmp, "kv.db"), durability="wal")
+        with store.transaction():
+            for t in range(tenants):
+                store.namespace(f"tenant-{t}").set_many((f"fact.{i}", f"value {i}") for i in range(per))
+        target = store.namespace(f"tenant-{tenants // 2}")
+        print(f"{tenants * per} keys in {tenants} namespaces; listing one namespace")
+
+        start = time.perf_counter()
+        all_keys = [key for (key,) in store.conn.execute("SELECT key FROM kv_store")]
+        listed = [key[len(target.prefix):] for key in all_keys if key.startswith(target.prefix)]
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        scanned = target.keys()
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        assert sorted(listed) == scanned
+        print(f"load all keys + filter: {full_ms:8.2f} ms")
+        print(f"namespace scan:         {scan_ms:8.2f} ms ({len(scanned)} keys)")
+
+
+if __name__ == "__main__":
+    main()
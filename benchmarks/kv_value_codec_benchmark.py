@@ -0,0 +1,77 @@
+# benchmarks/kv_value_codec_benchmark.py
+#
+# DB size and read/decode cost for structured agent facts: JSON strings
+# encoded by the caller (the old way) against typed values with the JSON
+# and msgpack codecs, with and without zlib compression.
+#
+#   python benchmarks/kv_value_codec_benchmark.py [n_facts]
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from orchestrai.memory.codecs import MsgpackCodec
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+
+WORDS = (
+    "user prefers concise answers about python data pipelines and asked to remember "
+    "the deployment region billing contact favourite editor timezone project deadline"
+).split()
+
+
+def make_fact(rng, i):
+    return {
+        "id": f"fact-{i}",
+        "type": rng.choice(["preference", "profile", "task", "episode"]),
+        "subject": "user",
+        "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 200))),
+        "confidence": round(rng.random(), 3),
+        "source_turn": rng.randint(1, 500),
+        "created_at": 1_760_000_000 + i,
+        "tags": rng.sample(WORDS, 3),
+        "entities": [{"name": rng.choice(WORDS), "kind": "concept"} for _ in range(rng.randint(0, 4))],
+    }
+
+
+def run(label, facts, tmp, encode=None, decode=None, **store_kwargs):
+    path = os.path.join(tmp, f"{label.replace(' ', '_')}.db")
+    store = KeyValueStore(path, **store_kwargs)
+    keys = [f"fact.{i}" for i in range(len(facts))]
+    store.set_many((k, encode(f) if encode else f) for k, f in zip(keys, facts))
+    store.conn.execute("VACUUM")
+
+    start = time.perf_counter()
+    values = store.get_many(keys)
+    if decode:
+        values = [decode(v) for v in values]
+    read_us = (time.perf_counter() - start) / len(keys) * 1e6
+    assert values == facts
+    store.close()
+    print(f"{label:<22} {os.path.getsize(path) / 1024:>9.0f} {read_us:>10.2f}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(0)
+    facts = [make_fact(rng, i) for i in range(n)]
+
+    print(f"{n} facts")
+    print(f"{'mode':<22} {'size KiB':>9} {'us/read':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        run("json text (caller)", facts, tmp, encode=json.dumps, decode=json.loads)
+        run("typed json", facts, tmp)
+        run("typed json + zlib", facts, tmp, compression="zlib", compress_threshold=256)
+        try:
+            codec = MsgpackCodec()
+        except ImportError:
+            print("msgpack not installed; skipping msgpack rows")
+            return
+        run("typed msgpack", facts, tmp, codec=codec)
+        run("typed msgpack + zlib", facts, tmp, codec=codec, compression="zlib", compress_threshold=256)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/kv_write_benchmark.py
+#
+# Write throughput of a file-backed KeyValueStore: per-write commit (the
+# original behaviour) against set_many, transaction(), group commit and
+# the WAL durability profile.
+#
+#   python benchmarks/kv_write_benchmark.py [n_writes]
+
+import os
+import sys
+import tempfile
+import time
+
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+
+
+def run(label, n, write, **store_kwargs):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = KeyValueStore(os.path.join(tmp, "kv.db"), **store_kwargs)
+        items = [(f"fact.{i}", f"value number {i}") for i in range(n)]
+        start = time.perf_counter()
+        write(store, items)
+        store.close()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:>8.3f} {n / elapsed:>12,.0f}")
+
+
+def one_by_one(store, items):
+    for key, value in items:
+        store.set(key, value)
+
+
+def in_transaction(store, items):
+    with store.transaction():
+        for key, value in items:
+            store.set(key, value)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    print(f"{n} writes to a file DB")
+    print(f"{'mode':<28} {'total s':>8} {'writes/s':>12}")
+    run("set, commit per write", n, one_by_one)
+    run("set, wal", n, one_by_one, durability="wal")
+    run("set, group commit 100", n, one_by_one, group_commit_size=100)
+    run("set, group commit 5 ms", n, one_by_one, group_commit_ms=5)
+    run("set, wal + group commit 100", n, one_by_one, durability="wal", group_commit_size=100)
+    run("transaction()", n, in_transaction)
+    run("set_many", n, lambda store, items: store.set_many(items))
+
+
+if __name__ == "__main__":
+    main()
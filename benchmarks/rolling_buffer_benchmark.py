@@ -0,0 +1,53 @@
+# benchmarks/rolling_buffer_benchmark.py
+#
+# add/query cost of RollingBufferStore at buffer sizes from 10 to 1M,
+# against the previous query that copied the whole deque per call, plus
+# a token-budgeted query (binary search over the running token sums).
+#
+#   python benchmarks/rolling_buffer_benchmark.py [top_k]
+
+import sys
+import time
+import tracemalloc
+
+from orchestrai.memory.stores.rolling_buffer import RollingBufferStore
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def copy_query(store, top_k):
+    """The previous implementation: list(deque)[-top_k:]."""
+    return list(store.buffer)[-top_k:]
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    top_k = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"query top_k={top_k}")
+    print(f"{'size':>9} {'add us':>8} {'query us':>9} {'copy query us':>14} {'budget us':>10} {'bytes/entry':>12}")
+    for size in SIZES:
+        store = RollingBufferStore(max_size=size)
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(size):
+            store.add("user", f"message {i}")
+        add_us = (time.perf_counter() - start) / size * 1e6
+        per_entry = tracemalloc.get_traced_memory()[0] / size
+        tracemalloc.stop()
+
+        calls = max(10, min(10_000, 10_000_000 // size))
+        query_us = per_call_us(lambda: store.query("", top_k=top_k), 10_000)
+        copy_us = per_call_us(lambda: copy_query(store, top_k), calls)
+        budget_us = per_call_us(lambda: store.query("", top_k=1_000_000, max_tokens=2_000), 10_000)
+        assert store.query("", top_k=top_k) == copy_query(store, top_k)
+        print(f"{size:>9} {add_us:>8.3f} {query_us:>9.3f} {copy_us:>14.3f} {budget_us:>10.3f} {per_entry:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/vector_index_recall.py
+#
+# Recall@k and query latency of each VectorMemoryStore index mode against
+# the exact flat baseline, on synthetic clustered vectors.
+#
+#   python benchmarks/vector_index_recall.py [n_vectors] [dim]
+
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+
+TOP_K = 10
+N_QUERIES = 200
+
+
+class LookupEmbeddingClient:
+    """Serves precomputed vectors: text "v<i>" maps to row i of `vectors`."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def _create(self, model, input):
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=self.vectors[int(t[1:])])
+            for i, t in enumerate(input)
+        ])
+
+
+def make_data(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((64, dim)).astype("float32") * 4
+    labels = rng.integers(0, len(centers), n + N_QUERIES)
+    data = centers[labels] + rng.standard_normal((n + N_QUERIES, dim)).astype("float32")
+    return data
+
+
+def build(data, n, dim, **kwargs):
+    store = VectorMemoryStore(
+        embed_model="lookup", dim=dim, client=LookupEmbeddingClient(data), batch_size=4096, **kwargs
+    )
+    start = time.perf_counter()
+    store.add_many((f"k{i}", f"v{i}", {}) for i in range(n))
+    store.wait_for_index()
+    store.build_index()
+    return store, time.perf_counter() - start
+
+
+def run_queries(store, n, **search_kwargs):
+    results, start = [], time.perf_counter()
+    for q in range(N_QUERIES):
+        results.append({key for key, _ in store.query(f"v{n + q}", top_k=TOP_K, **search_kwargs)})
+    return results, (time.perf_counter() - start) / N_QUERIES * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    data = make_data(n, dim)
+    nlist = max(16, int(np.sqrt(n)))
+
+    flat, build_s = build(data, n, dim)
+    truth, flat_ms = run_queries(flat, n)
+    print(f"{n} vectors, dim={dim}, recall@{TOP_K} over {N_QUERIES} queries")
+    print(f"{'mode':<10} {'setting':<14} {'recall':>7} {'ms/query':>9} {'build s':>8}")
+    print(f"{'flat':<10} {'-':<14} {1.0:>7.3f} {flat_ms:>9.3f} {build_s:>8.2f}")
+
+    configs = [
+        ("ivf_flat", {"nlist": nlist}, "nprobe", [1, 4, 16, 64]),
+        ("ivf_pq", {"nlist": nlist, "pq_m": 16 if dim % 16 == 0 else 8}, "nprobe", [1, 4, 16, 64]),
+        ("hnsw", {"hnsw_m": 32}, "ef_search", [16, 64, 256]),
+    ]
+    for mode, kwargs, knob, values in configs:
+        store, build_s = build(data, n, dim, index_type=mode, train_size=n, **kwargs)
+        for value in values:
+            got, ms = run_queries(store, n, **{knob: value})
+            recall = np.mean([len(g & t) / TOP_K for g, t in zip(got, truth)])
+            print(f"{mode:<10} {f'{knob}={value}':<14} {recall:>7.3f} {ms:>9.3f} {build_s:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/vector_ingest_benchmark.py
+#
+# Ingest throughput of VectorMemoryStore against a local fake embedding
+# client that simulates per-request network latency, and with the local
+# HashingEmbedder.
+#
+#   python benchmarks/vector_ingest_benchmark.py [n_entries] [latency_ms]
+
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+
+from orchestrai.memory.embedders import HashingEmbedder
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+
+DIM = 256
+
+
+class FakeEmbeddingClient:
+    """Returns deterministic vectors after sleeping `latency` seconds per request."""
+
+    def __init__(self, latency: float, dim: int = DIM):
+        self.latency = latency
+        self.dim = dim
+        self.requests = 0
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def _create(self, model, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.requests += 1
+        time.sleep(self.latency)
+        data = []
+        for i, text in enumerate(texts):
+            rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+            data.append(SimpleNamespace(index=i, embedding=rng.standard_normal(self.dim).tolist()))
+        return SimpleNamespace(data=data)
+
+
+def run(label, n, latency, ingest, **store_kwargs):
+    client = FakeEmbeddingClient(latency)
+    store_kwargs.setdefault("client", client)
+    store = VectorMemoryStore(embed_model="fake", dim=DIM, **store_kwargs)
+    entries = [(f"doc{i}", f"def fn_{i}(): docstring number {i}", {"type": "docstring"}) for i in range(n)]
+
+    start = time.perf_counter()
+    ingest(store, entries)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    store.close()
+
+    print(f"{label:<24} {n / elapsed:>10.0f} entries/s  {client.requests:>6} requests  {elapsed:7.2f}s")
+
+
+def per_entry(store, entries):
+    for key, value, meta in entries:
+        store.add(key, value, meta)
+
+
+def batched(store, entries):
+    store.add_many(entries)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 5.0) / 1000
+    print(f"{n} entries, {latency * 1000:.1f} ms simulated latency per request")
+    run("add (per entry)", n, latency, per_entry)
+    run("add_many", n, latency, batched)
+    run("add (write-behind)", n, latency, per_entry, write_behind=True)
+    run("add (local embedder)", n, latency, per_entry, embedder=HashingEmbedder(dim=DIM))
+    run("add_many (local embedder)", n, latency, batched, embedder=HashingEmbedder(dim=DIM))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/vector_query_many_benchmark.py
+#
+# Looping VectorMemoryStore.query versus one query_many call, with a fake
+# embedding client that simulates per-request network latency.
+#
+#   python benchmarks/vector_query_many_benchmark.py [n_entries] [n_queries] [latency_ms]
+
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+
+DIM = 256
+TOP_K = 10
+
+
+class FakeEmbeddingClient:
+    """Returns deterministic vectors after sleeping `latency` seconds per request."""
+
+    def __init__(self, latency: float, dim: int = DIM):
+        self.latency = latency
+        self.dim = dim
+        self.requests = 0
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def _create(self, model, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.requests += 1
+        time.sleep(self.latency)
+        data = []
+        for i, text in enumerate(texts):
+            rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+            data.append(SimpleNamespace(index=i, embedding=rng.standard_normal(self.dim).tolist()))
+        return SimpleNamespace(data=data)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 20.0) / 1000
+
+    client = FakeEmbeddingClient(latency=0.0)
+    store = VectorMemoryStore(embed_model="fake", dim=DIM, client=client, batch_size=2048)
+    store.add_many((f"k{i}", f"entry {i}", None) for i in range(n))
+    client.latency = latency
+    queries = [f"entry {i * 7 % n}" for i in range(n_queries)]
+
+    print(f"{n} entries, {n_queries} queries, top_k={TOP_K}, {latency * 1000:.0f} ms/request")
+    print(f"{'method':<12} {'requests':>9} {'total s':>8} {'ms/query':>9}")
+
+    client.requests = 0
+    looped, loop_s = timed(lambda: [store.query(q, top_k=TOP_K) for q in queries])
+    print(f"{'query loop':<12} {client.requests:>9} {loop_s:>8.3f} {loop_s / n_queries * 1000:>9.3f}")
+
+    client.requests = 0
+    batched, many_s = timed(lambda: store.query_many(queries, top_k=TOP_K))
+    print(f"{'query_many':<12} {client.requests:>9} {many_s:>8.3f} {many_s / n_queries * 1000:>9.3f}")
+
+    assert batched == looped
+    print(f"speedup: {loop_s / many_s:.1f}x")
+
+    # search cost alone, with embedding latency taken out
+    client.latency = 0.0
+    _, loop_s = timed(lambda: [store.query(q, top_k=TOP_K) for q in queries])
+    _, many_s = timed(lambda: store.query_many(queries, top_k=TOP_K))
+    print(f"no latency:  query loop {loop_s:.3f}s, query_many {many_s:.3f}s ({loop_s / many_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -66,8 +66,9 @@ def main():
 
     # ——— 3) Index code docstrings ———
     snippets = load_code_docstrings(".")
-    for key, doc in snippets:
-        vector_store.add(key, doc, metadata={"type": "docstring"})
+    vector_store.add_many(
+        (key, doc, {"type": "docstring"}) for key, doc in snippets
+    )
     print(f"Indexed {len(snippets)} function docstrings into semantic memory.")
 
     # ——— 4) Index recent commit messages ———
@@ -95,7 +96,7 @@ def main():
             resp = f"Max line length is set to {val} characters."
         else:
             # 5c) Semantic lookup in code docstrings
-            hits = vector_store.query(q, top_k=3)
+            hits = vector_store.query(q, top_k=3, filter={"type": "docstring"})
             resp = "Top matches:\n" + "\n".join(
                 f"  - [{meta['type']}] {meta['type']} for {key}: {meta.get('text')}"
                 for key, meta in hits
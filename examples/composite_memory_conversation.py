@@ -11,6 +11,7 @@ from orchestrai.memory.stores.summarizing_memory import SummarizingMemoryStore
 from orchestrai.memory.stores.vector_memory import VectorMemoryStore
 from orchestrai.memory.stores.key_value_store import KeyValueStore
 from orchestrai.memory.adapters.openai_adapter import OpenAIAdapter
+from orchestrai.memory.openai_client import ResilientOpenAIClient
 
 def main():
     # 1) Load your OpenAI key
@@ -19,27 +20,31 @@ def main():
     if not openai.api_key:
         raise RuntimeError("Missing OPENAI_API_KEY in .env")
 
-    # 2) Build sub-stores
+    # 2) One pooled, retrying client shared by every component
+    client = ResilientOpenAIClient(api_key=openai.api_key)
+
+    # 3) Build sub-stores
     recency_buf = RollingBufferStore(max_size=20)
-    summarizer = SummarizingMemoryStore(inner=recency_buf, threshold=5, chunk_size=2)
-    semantic_store = VectorMemoryStore(embed_model="text-embedding-ada-002", dim=1536)
+    summarizer = SummarizingMemoryStore(inner=recency_buf, threshold=5, chunk_size=2, client=client)
+    semantic_store = VectorMemoryStore(embed_model="text-embedding-ada-002", dim=1536, client=client)
     kv_store = KeyValueStore(db_path="agent_memory.db")
 
-    # 3) Compose them
+    # 4) Compose them
     composite = CompositeMemoryStore(
         recency_store=summarizer,
         semantic_store=semantic_store,
         kv_store=kv_store
     )
 
-    # 4) Adapter wrapping the composite memory
+    # 5) Adapter wrapping the composite memory
     adapter = OpenAIAdapter(
         memory=composite,
         model="gpt-4o-mini",
-        default_chat_kwargs={"temperature": 0.5, "max_tokens": 100}
+        default_chat_kwargs={"temperature": 0.5, "max_tokens": 100},
+        client=client,
     )
 
-    # 5) A mini-conversation
+    # 6) A mini-conversation
     dialogue = [
         "Hello, who am I?",                # regular LLM turn
         "Remember: my name is Akash.",     # KV->store
@@ -70,18 +75,18 @@ def main():
 
         print(f"Assistant: {response}")
 
-    # 6) Show explicit KV fact
+    # 7) Show explicit KV fact
     print("\n— Explicit KV fact —")
     print("user.name =", composite.kv_get("user.name"))
 
-    # 7) Semantic recall for "first"
+    # 8) Semantic recall for "first"
     print("\n— Semantic recall for 'first' —")
     hits = composite.query("first", top_k=3)
     for i, (key, content, meta) in enumerate(hits, start=1):
         text = meta.get("text", content)
         print(f"  {i}. key={key}, text={text}")
 
-    # 8) Recency buffer contents
+    # 9) Recency buffer contents
     print("\n— Recency buffer —")
     for role, content, _ in recency_buf.query("", top_k=10):
         print(f"  [{role}] {content}")
@@ -0,0 +1,181 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+import openai
+from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.prompt_assembler import AssembledPrompt, PromptAssembler, memory_sections, query_text
+
+T = TypeVar("T")
+
+
+class AsyncOpenAIAdapter():
+    """
+    asyncio counterpart of OpenAIAdapter, built on `openai.AsyncOpenAI`.
+
+    Memory stores are synchronous, so their calls run on `executor` (the
+    event loop's default executor if None) and never block the loop.
+    Persisting the incoming messages and retrieving the memory context
+    run concurrently; the assistant's reply is written in the background
+    once the response is back, so `call` returns without waiting for it.
+    `flush()` waits for those writes and re-raises the first that failed.
+
+    The prompt is built by `assembler` as in OpenAIAdapter; it also drops
+    the incoming messages from the retrieved context, which may or may
+    not contain them since retrieval doesn't wait for the writes. A
+    conversation's next turn may be retrieved before its previous reply
+    is stored unless `flush()` is awaited in between. The memory store
+    must tolerate calls from several threads at once.
+
+    Parameters:
+      - memory: your MemoryStore implementation
+      - model: the model name (e.g. "gpt-4o")
+      - default_chat_kwargs: a dict of default parameters for Chat API
+      - client: an `openai.AsyncOpenAI`-like client, created on first use if None
+      - executor: where memory calls run
+      - assembler: builds the prompt within per-section token budgets
+    """
+
+    def __init__(
+            self,
+            memory: MemoryStore,
+            model: str = "gpt-4o-mini",
+            default_chat_kwargs: Dict[str, Any] = None,
+            client: Any = None,
+            executor: Optional[Executor] = None,
+            assembler: Optional[PromptAssembler] = None,
+    ):
+        self.memory = memory
+        self.model = model
+        self.default_chat_kwargs = default_chat_kwargs or {
+            "temperature": 0.7,
+        }
+        self.client = client
+        self.executor = executor
+        self.assembler = assembler or PromptAssembler()
+        # prompt of the most recent call
+        self.last_prompt: Optional[AssembledPrompt] = None
+        self._pending: Set["asyncio.Future[None]"] = set()
+        self._write_error: Optional[BaseException] = None
+
+    async def call(
+            self,
+            messages: List[Dict[str, str]],
+            chat_kwargs: Dict[str, Any] = None,
+    ) -> str:
+        """
+        Send messages to OpenAI, with memory pre- and post-processing.
+
+        Arguments:
+        - messages: list of {"role": "...", "content": "..."} dicts
+        - chat_kwargs: overrides or additions to default_chat_kwargs
+
+        Returns:
+        - assistant reply content
+        """
+        payload, params = await self._prepare(messages, chat_kwargs)
+        resp = await self.client.chat.completions.create(
+            model=self.model,
+            messages=payload,
+            **params,
+        )
+        reply = resp.choices[0].message.content
+
+        # 3) Save the assistant's reply without holding up the caller
+        self._write_reply(reply)
+        return reply
+
+    async def stream(
+            self,
+            messages: List[Dict[str, str]],
+            chat_kwargs: Dict[str, Any] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Like `call`, but yields the reply's text pieces as they arrive.
+
+        The pieces are joined once at the end and the reply is written
+        (in the background, see `flush`) exactly once, also when the
+        consumer stops early or the task is cancelled (then with metadata
+        {"truncated": True}). Nothing is written if no text came.
+        """
+        payload, params = await self._prepare(messages, chat_kwargs)
+        chunks = await self.client.chat.completions.create(
+            model=self.model,
+            messages=payload,
+            stream=True,
+            **params,
+        )
+        parts: List[str] = []
+        finished = False
+        try:
+            async for chunk in chunks:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if piece:
+                    parts.append(piece)
+                    yield piece
+            finished = True
+        finally:
+            # schedule the write before awaiting anything else
+            if parts:
+                self._write_reply("".join(parts), None if finished else {"truncated": True})
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                await close()
+
+    async def _prepare(
+            self,
+            messages: List[Dict[str, str]],
+            chat_kwargs: Dict[str, Any] = None,
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        # 1) Persist incoming user/system messages while retrieving memory
+        incoming = [
+            (msg.get("role"), msg.get("content"))
+            for msg in messages
+            if msg.get("role") in ("user", "system")
+        ]
+        _, sections = await asyncio.gather(
+            self._run(self._persist, incoming),
+            self._run(memory_sections, self.memory, query_text(messages), 10),
+        )
+
+        # 2) Combine memory + new messages within the token budgets
+        prompt = self.assembler.assemble(sections, messages)
+        self.last_prompt = prompt
+        params = {**self.default_chat_kwargs}
+        if chat_kwargs:
+            params.update(chat_kwargs)
+        if self.client is None:
+            self.client = openai.AsyncOpenAI()
+        return prompt.messages, params
+
+    async def flush(self) -> None:
+        """
+        Wait until every deferred reply write has reached memory.
+        """
+        while self._pending:
+            await asyncio.wait(set(self._pending))
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args))
+
+    def _write_reply(self, reply: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        write = asyncio.ensure_future(self._run(self.memory.add, "assistant", reply, metadata))
+        self._pending.add(write)
+        write.add_done_callback(self._write_done)
+
+    def _persist(self, entries: List[tuple]) -> None:
+        # one job, so the messages keep their order in memory
+        for role, content in entries:
+            self.memory.add(role, content)
+
+    def _write_done(self, write: "asyncio.Future[None]") -> None:
+        self._pending.discard(write)
+        if not write.cancelled() and write.exception() is not None and self._write_error is None:
+            self._write_error = write.exception()
@@ -1,6 +1,7 @@
 import openai
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.prompt_assembler import AssembledPrompt, PromptAssembler, memory_sections, query_text
 
 class OpenAIAdapter():
     """
@@ -12,6 +13,10 @@ class OpenAIAdapter():
       - memory: your MemoryStore implementation
       - model: the model name (e.g. "gpt-4o")
       - default_chat_kwargs: a dict of default parameters for Chat API
+      - assembler: builds the prompt within per-section token budgets;
+        `last_prompt.tokens_saved` reports what it left out on the last call
+      - client: anything exposing `chat.completions.create`, e.g. a shared
+        ResilientOpenAIClient; defaults to the `openai` module
     """
 
     def __init__(
@@ -19,6 +24,8 @@ class OpenAIAdapter():
             memory : MemoryStore,
             model: str = "gpt-4o-mini",
             default_chat_kwargs: Dict[str, Any] = None,
+            assembler: Optional[PromptAssembler] = None,
+            client: Any = None,
     ):
         self.memory = memory
         self.model = model
@@ -26,6 +33,9 @@ class OpenAIAdapter():
             "temperature": 0.7,
             #add other defaults for max_tokens, top_p, etc.
         }
+        self.assembler = assembler or PromptAssembler()
+        self.last_prompt: Optional[AssembledPrompt] = None
+        self.client = client
 
     def call(
             self, 
@@ -42,6 +52,65 @@ class OpenAIAdapter():
         Returns:
         - assistant reply content
         """
+        payload, params = self._prepare(messages, chat_kwargs)
+
+        # 5) Call openai endpoint
+        resp = (self.client or openai).chat.completions.create(
+            model = self.model,
+            messages = payload,
+            **params,
+        )
+        reply = resp.choices[0].message.content
+
+        # 6) Save the assistent's reply to memory
+        self.memory.add("assistant", reply)
+
+
+        return reply
+
+    def stream(
+            self,
+            messages: List[Dict[str,str]],
+            chat_kwargs: Dict[str, Any] = None,
+    ) -> Iterator[str]:
+        """
+        Like `call`, but yields the reply's text pieces as they arrive.
+
+        The pieces are collected in a list and joined once; the reply is
+        written to memory exactly once when the stream ends, also when the
+        consumer stops early or the stream fails part way (then with
+        metadata {"truncated": True}). Nothing is written if no text came.
+        """
+        payload, params = self._prepare(messages, chat_kwargs)
+        chunks = (self.client or openai).chat.completions.create(
+            model = self.model,
+            messages = payload,
+            stream = True,
+            **params,
+        )
+        parts: List[str] = []
+        finished = False
+        try:
+            for chunk in chunks:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if piece:
+                    parts.append(piece)
+                    yield piece
+            finished = True
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            if parts:
+                self.memory.add("assistant", "".join(parts), None if finished else {"truncated": True})
+
+    def _prepare(
+            self,
+            messages: List[Dict[str,str]],
+            chat_kwargs: Dict[str, Any] = None,
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
         # 1) Persist incoming user/system messages into memory
         for msg in messages:
             role = msg.get("role")
@@ -50,31 +119,15 @@ class OpenAIAdapter():
                 self.memory.add(role, content)
 
             
-        # 2) Retrieve recent memory entries
-        mem_entries = self.memory.query("", top_k = 10)
-        mem_messages = [
-            {"role": role, "content":content}
-            for role, content, _ in mem_entries
-        ]
+        # 2) Retrieve memory context, split into prompt sections
+        sections = memory_sections(self.memory, query_text(messages), top_k = 10)
 
-        # 3) Combine memory + new messages
-        payload = mem_messages + messages
+        # 3) Combine memory + new messages within the token budgets
+        self.last_prompt = self.assembler.assemble(sections, messages)
+        payload = self.last_prompt.messages
 
         # 4) prepare chat parameters
         params = {**self.default_chat_kwargs}
         if chat_kwargs:
             params.update(chat_kwargs)
-
-        # 5) Call openai endpoint
-        resp = openai.chat.completions.create(
-            model = self.model,
-            messages = payload,
-            **params,
-        )
-        reply = resp.choices[0].message.content
-
-        # 6) Save the assistent's reply to memory
-        self.memory.add("assistant", reply)
-
-
-        return reply
\ No newline at end of file
+        return payload, params
\ No newline at end of file
@@ -0,0 +1,120 @@
+# src/orchestrai/memory/codecs.py
+
+import json
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class Codec(ABC):
+    """
+    Serializes structured values (dicts, lists, ...) to bytes.
+
+    `type_tag` is stored next to every encoded value so rows stay readable
+    after the store's codec changes; built-in codecs use 5 and 6, custom
+    codecs should pick a tag from 8 to 15.
+    """
+    type_tag: int
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        ...
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        ...
+
+
+class JSONCodec(Codec):
+    """Compact UTF-8 JSON: no whitespace, non-ASCII kept as is."""
+
+    type_tag = 5
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack via the optional `msgpack` package; smaller and faster than JSON."""
+
+    type_tag = 6
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError("MsgpackCodec requires the 'msgpack' package") from e
+        self._msgpack = msgpack
+
+    def encode(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+class Compressor(ABC):
+    """Byte compressor; `flag` is OR-ed into the stored type tag."""
+    flag: int
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        ...
+
+
+class ZlibCompressor(Compressor):
+    flag = 0x10
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    """Zstandard via the optional `zstandard` package."""
+
+    flag = 0x20
+
+    def __init__(self, level: int = 3):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("ZstdCompressor requires the 'zstandard' package") from e
+        self.level = level
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+COMPRESSORS = {"zlib": ZlibCompressor, "zstd": ZstdCompressor}
+
+
+def make_compressor(name: Optional[str]) -> Optional[Compressor]:
+    """Build a compressor from its name ("zlib", "zstd") or return None."""
+    if name is None:
+        return None
+    if name not in COMPRESSORS:
+        raise ValueError(f"compression must be one of {tuple(COMPRESSORS)}, got {name!r}")
+    return COMPRESSORS[name]()
+
+
+# Used to read back values written with a codec/compressor other than the current one
+CODECS_BY_TAG: Dict[int, type] = {JSONCodec.type_tag: JSONCodec, MsgpackCodec.type_tag: MsgpackCodec}
+COMPRESSORS_BY_FLAG: Dict[int, type] = {ZlibCompressor.flag: ZlibCompressor, ZstdCompressor.flag: ZstdCompressor}
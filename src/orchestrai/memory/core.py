@@ -14,3 +14,17 @@ class MemoryStore(ABC):
     @abstractmethod
     def summarize(self) -> None:
         ...
+
+    def pop_oldest(self, n: int) -> List[Tuple[str, str, Dict]]:
+        """
+        Remove and return the `n` oldest entries as (key, value, metadata),
+        oldest first. Stores without an insertion order don't support it.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support pop_oldest")
+
+    def peek_oldest(self, n: int) -> List[Tuple[str, str, Dict]]:
+        """
+        The `n` oldest entries as `pop_oldest` would return them, without
+        removing them.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support peek_oldest")
@@ -0,0 +1,120 @@
+# src/orchestrai/memory/embedders.py
+
+from abc import ABC, abstractmethod
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+import openai
+
+
+class Embedder(ABC):
+    """
+    Turns a batch of texts into a (len(texts), dim) float32 matrix.
+
+    `model` names the embedding space: vectors from embedders with
+    different `model` values must not be mixed (it is also the
+    EmbeddingCache key).
+    """
+    model: str
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+class OpenAIEmbedder(Embedder):
+    """Remote embeddings through `client.embeddings.create`, one request per call."""
+
+    def __init__(
+        self,
+        model: str = "text-embedding-ada-002",
+        dim: int = 1536,
+        client: Any = None,
+    ):
+        self.model = model
+        self.dim = dim
+        # Anything exposing `embeddings.create(model=..., input=[...])`
+        self.client = client or openai
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        resp = self.client.embeddings.create(
+            model=self.model,
+            input=list(texts),
+        )
+        data = sorted(resp.data, key=lambda d: d.index)
+        return np.array([d.embedding for d in data], dtype="float32").reshape(len(texts), -1)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic local embedder: hashed character n-gram counts projected
+    to `dim` dimensions by a fixed Gaussian random matrix, L2-normalized.
+
+    A whole batch is hashed with vectorized NumPy over the concatenated
+    texts and projected with a single matrix multiply, so it needs no
+    network and is fast enough for tests and benchmarks. Texts sharing
+    many n-grams land close together; it is not a semantic model.
+    """
+
+    _MULT = np.uint64(0x100000001B3)
+    _MIX = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(
+        self,
+        dim: int = 256,
+        ngram_range: Tuple[int, int] = (2, 4),
+        n_features: int = 1 << 14,
+        seed: int = 0,
+    ):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.n_features = n_features
+        self.seed = seed
+        self.model = f"hashing-{dim}-{ngram_range[0]}-{ngram_range[1]}-{n_features}-{seed}"
+        rng = np.random.default_rng(seed)
+        self.projection = (
+            rng.standard_normal((n_features, dim), dtype=np.float32) / np.float32(np.sqrt(dim))
+        )
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        n = len(texts)
+        if n == 0:
+            return np.empty((0, self.dim), dtype="float32")
+
+        # 1) One code-point array for the batch, texts separated by NUL
+        padded = [f" {t.lower()} " for t in texts]
+        codes = np.frombuffer("\0".join(padded).encode("utf-32-le"), dtype=np.uint32)
+        codes = codes.astype(np.uint64)
+        lengths = np.fromiter((len(t) + 1 for t in padded), dtype=np.int64, count=n)
+        rows = np.repeat(np.arange(n), lengths)[: len(codes)]
+        seps = np.concatenate([[0], np.cumsum(codes == 0)])
+
+        # 2) Hash every n-gram window that does not cross a separator
+        row_parts: List[np.ndarray] = []
+        col_parts: List[np.ndarray] = []
+        for k in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            windows = len(codes) - k + 1
+            if windows <= 0:
+                continue
+            h = np.full(windows, k, dtype=np.uint64)
+            for j in range(k):
+                h = h * self._MULT + codes[j:j + windows]
+            h = (h * self._MIX) >> np.uint64(17)
+            valid = seps[k:k + windows] == seps[:windows]
+            row_parts.append(rows[:windows][valid])
+            col_parts.append((h % np.uint64(self.n_features))[valid].astype(np.int64))
+
+        # 3) Sublinear term counts over the features this batch uses,
+        #    projected with one matrix multiply
+        if not row_parts:
+            return np.zeros((n, self.dim), dtype=np.float32)
+        flat = np.concatenate(row_parts) * self.n_features + np.concatenate(col_parts)
+        cells, counts = np.unique(flat, return_counts=True)
+        cell_rows, cell_cols = np.divmod(cells, self.n_features)
+        features, cell_features = np.unique(cell_cols, return_inverse=True)
+        weights = np.zeros((n, len(features)), dtype=np.float32)
+        weights[cell_rows, cell_features] = np.log1p(counts, dtype=np.float32)
+        vecs = weights @ self.projection[features]
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        return vecs / np.maximum(norms, 1e-12)
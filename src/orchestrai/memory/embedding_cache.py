@@ -0,0 +1,147 @@
+# src/orchestrai/memory/embedding_cache.py
+
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from orchestrai.memory.embedders import Embedder
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (embed_model, text hash).
+
+    Vectors live in an in-memory LRU tier bounded to `max_entries`. When
+    `db_path` is given, every vector is also written to a SQLite table so a
+    restarted process can reuse embeddings instead of recomputing them;
+    disk hits are promoted back into the LRU tier.
+    """
+
+    def __init__(self, max_entries: int = 10_000, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT, digest BLOB, vector BLOB, PRIMARY KEY (model, digest)"
+                ") WITHOUT ROWID"
+            )
+            self.conn.commit()
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """Return the cached vector for `text`, or None."""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up many texts at once; missing entries come back as None."""
+        keys = [(model, self.digest(t)) for t in texts]
+        found: List[Optional[np.ndarray]] = [None] * len(keys)
+        cold: Dict[bytes, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vec = self._lru.get(key)
+                if vec is not None:
+                    self._lru.move_to_end(key)
+                    found[i] = vec
+                    self.hits += 1
+                else:
+                    cold.setdefault(key[1], []).append(i)
+
+            if cold and self.conn is not None:
+                digests = list(cold)
+                for start in range(0, len(digests), 500):
+                    chunk = digests[start:start + 500]
+                    rows = self.conn.execute(
+                        "SELECT digest, vector FROM embeddings WHERE model = ? "
+                        f"AND digest IN ({','.join('?' * len(chunk))})",
+                        (model, *chunk),
+                    ).fetchall()
+                    for digest, blob in rows:
+                        vec = np.frombuffer(blob, dtype="float32")
+                        self._remember((model, digest), vec)
+                        for i in cold.pop(digest):
+                            found[i] = vec
+                            self.hits += 1
+                            self.disk_hits += 1
+
+            self.misses += sum(len(idx) for idx in cold.values())
+        return found
+
+    def put(self, model: str, text: str, vector: np.ndarray) -> None:
+        self.put_many(model, [text], [vector])
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[np.ndarray]) -> None:
+        """Insert vectors for texts into both tiers."""
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vec = np.ascontiguousarray(vector, dtype="float32").reshape(-1)
+                digest = self.digest(text)
+                self._remember((model, digest), vec)
+                rows.append((model, digest, vec.tobytes()))
+            if self.conn is not None and rows:
+                self.conn.executemany(
+                    "REPLACE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self.conn.commit()
+
+    def embed(self, embedder: "Embedder", texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed `texts` through the cache: cached vectors are reused and the
+        remaining distinct texts go to `embedder` in a single call.
+        """
+        cached = self.get_many(embedder.model, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        if missing:
+            fresh = embedder.embed(missing)
+            self.put_many(embedder.model, missing, fresh)
+            by_text = dict(zip(missing, fresh))
+            cached = [v if v is not None else by_text[t] for t, v in zip(texts, cached)]
+        return np.vstack(cached).astype("float32", copy=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters plus the overall hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._lru),
+        }
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (the on-disk tier is kept)."""
+        with self._lock:
+            self._lru.clear()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _remember(self, key: Tuple[str, bytes], vec: np.ndarray) -> None:
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
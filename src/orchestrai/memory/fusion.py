@@ -0,0 +1,74 @@
+# src/orchestrai/memory/fusion.py
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+Entry = Tuple[str, str, Dict[str, Any]]
+# One source's hits, best first, each with the source's own score (or None)
+Hits = List[Tuple[Entry, Optional[float]]]
+
+
+class FusionStrategy(ABC):
+    """
+    Merges the ranked hits of several named sources into one ranking,
+    de-duplicated by key. Ties keep the order in which keys were first
+    seen, sources taken in the order given.
+    """
+
+    @abstractmethod
+    def fuse(self, results: Mapping[str, Hits], top_k: int) -> List[Entry]:
+        ...
+
+
+def _top(scores: Dict[str, float], entries: Dict[str, Entry], top_k: int) -> List[Entry]:
+    ranked = sorted(scores, key=scores.__getitem__, reverse=True)
+    return [entries[key] for key in ranked[:max(top_k, 0)]]
+
+
+class ReciprocalRankFusion(FusionStrategy):
+    """
+    Scores each key by the sum of `weight / (k + rank)` over the sources
+    that returned it (ranks start at 1). Only ranks are used, so sources
+    whose scores aren't comparable still mix fairly.
+    """
+
+    def __init__(self, k: int = 60, weights: Optional[Mapping[str, float]] = None):
+        self.k = k
+        self.weights = dict(weights or {})
+
+    def fuse(self, results: Mapping[str, Hits], top_k: int) -> List[Entry]:
+        scores: Dict[str, float] = {}
+        entries: Dict[str, Entry] = {}
+        for name, hits in results.items():
+            weight = self.weights.get(name, 1.0)
+            for rank, (entry, _) in enumerate(hits, 1):
+                key = entry[0]
+                scores[key] = scores.get(key, 0.0) + weight / (self.k + rank)
+                entries.setdefault(key, entry)
+        return _top(scores, entries, top_k)
+
+
+class WeightedScoreFusion(FusionStrategy):
+    """
+    Scores each key by the weighted sum of its per-source scores. A hit
+    without a score of its own (e.g. from the recency buffer) scores
+    `decay ** rank`, so the further an entry sits from the top of its
+    list, e.g. the older it is, the less it counts.
+    """
+
+    def __init__(self, weights: Optional[Mapping[str, float]] = None, decay: float = 0.9):
+        self.weights = dict(weights or {})
+        self.decay = decay
+
+    def fuse(self, results: Mapping[str, Hits], top_k: int) -> List[Entry]:
+        scores: Dict[str, float] = {}
+        entries: Dict[str, Entry] = {}
+        for name, hits in results.items():
+            weight = self.weights.get(name, 1.0)
+            for rank, (entry, score) in enumerate(hits):
+                if score is None:
+                    score = self.decay ** rank
+                key = entry[0]
+                scores[key] = scores.get(key, 0.0) + weight * score
+                entries.setdefault(key, entry)
+        return _top(scores, entries, top_k)
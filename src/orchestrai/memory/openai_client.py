@@ -0,0 +1,273 @@
+# src/orchestrai/memory/openai_client.py
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional
+
+import httpx
+import openai
+
+from orchestrai.memory.tokenizers import CharEstimateTokenizer, Tokenizer
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class RateLimit(NamedTuple):
+    """A model's quota: requests and (estimated) tokens per minute; None means unlimited."""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate` per second up to
+    `capacity`. `acquire` blocks until the amount is available; a request
+    larger than the capacity waits for a full bucket.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._level >= amount:
+                    self._level -= amount
+                    return
+                wait_for = max(self._paused_until - now, (amount - self._level) / self.rate)
+            time.sleep(wait_for)
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Take `amount` only if it is available right now and the bucket isn't paused."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            if now < self._paused_until or self._level < amount:
+                return False
+            self._level -= amount
+            return True
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self._level = min(self.capacity, self._level + min(amount, self.capacity))
+
+    def pause(self, seconds: float) -> None:
+        """Hand out nothing for `seconds`, e.g. after the server said to back off."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class ResilientOpenAIClient:
+    """
+    One OpenAI client to share between adapters and stores.
+
+    Exposes `chat.completions.create` and `embeddings.create`, so it can
+    be passed as `client=` to OpenAIAdapter, VectorMemoryStore (or
+    OpenAIEmbedder) and SummarizingMemoryStore. Around each request it:
+
+      - reuses connections from one pooled httpx client
+        (`max_connections`, `max_keepalive_connections`);
+      - waits for the model's token buckets from `rate_limits`
+        ({model: RateLimit}); token costs are estimated from the input
+        text plus `max_tokens`;
+      - caps requests in flight at `max_concurrency`;
+      - retries connection errors, timeouts and RETRY_STATUSES up to
+        `max_retries` times with full-jitter exponential backoff, waiting
+        at least the server's Retry-After; a 429 also pauses that model's
+        buckets so every thread backs off together;
+      - with `hedge_after` set, sends a duplicate of a non-streaming
+        request still unanswered `hedge_after` seconds after it was sent
+        (time spent waiting on the limiter doesn't count) and returns
+        whichever answers first (the other is left to finish). The
+        duplicate takes its own bucket tokens and slot, and is skipped
+        unless they are free at once, so hedging never queues on the
+        limiter or adds load while a model is paused after a 429.
+
+    `client` is the underlying OpenAI client; by default one is built
+    with its own retries disabled and `api_key`/`base_url`/`timeout`.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 60.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        rate_limits: Optional[Mapping[str, RateLimit]] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        hedge_after: Optional[float] = None,
+        tokenizer: Optional[Tokenizer] = None,
+    ):
+        if client is None:
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                ),
+                timeout=timeout,
+            )
+            client = openai.OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=0,
+                http_client=self.http_client,
+            )
+        else:
+            self.http_client = None
+        self.client = client
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.tokenizer = tokenizer or CharEstimateTokenizer()
+        self.retries = 0
+        self.hedges = 0
+
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        for model, limit in (rate_limits or {}).items():
+            buckets = {}
+            if limit.requests_per_minute:
+                buckets["requests"] = TokenBucket(limit.requests_per_minute / 60, limit.requests_per_minute)
+            if limit.tokens_per_minute:
+                buckets["tokens"] = TokenBucket(limit.tokens_per_minute / 60, limit.tokens_per_minute)
+            self._buckets[model] = buckets
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+
+    def close(self) -> None:
+        """Stop the hedging threads and close the connection pool we own."""
+        with self._hedge_lock:
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=False)
+                self._hedge_pool = None
+        if self.http_client is not None:
+            self.http_client.close()
+
+    def _create_chat(self, **kwargs: Any) -> Any:
+        text = "".join(str(m.get("content") or "") for m in kwargs.get("messages", []))
+        cost = self.tokenizer.count(text) + (kwargs.get("max_tokens") or 0)
+        return self._request(self.client.chat.completions.create, kwargs, cost)
+
+    def _create_embeddings(self, **kwargs: Any) -> Any:
+        texts = kwargs.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        cost = sum(self.tokenizer.count(t) for t in texts)
+        return self._request(self.client.embeddings.create, kwargs, cost)
+
+    def _request(self, fn: Callable[..., Any], kwargs: Dict[str, Any], cost: int) -> Any:
+        model = kwargs.get("model", "")
+        hedge = self.hedge_after is not None and not kwargs.get("stream")
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._admit(model, cost)
+                if hedge:
+                    return self._hedged(fn, kwargs, model, cost)
+                return self._send(fn, kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not self._retryable(e):
+                    raise
+                retry_after = self._retry_after(e)
+                if getattr(e, "status_code", None) == 429:
+                    for bucket in self._buckets.get(model, {}).values():
+                        bucket.pause(retry_after or self.backoff_base)
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                self.retries += 1
+                time.sleep(max(delay, retry_after or 0.0))
+
+    def _admit(self, model: str, cost: int, block: bool = True) -> bool:
+        """
+        Take the model's bucket tokens and a concurrency slot for one
+        request. With `block=False` take them only if all are free right
+        now (giving back any already taken) and report whether they were.
+        """
+        taken = []
+        for name, amount in (("requests", 1), ("tokens", cost)):
+            bucket = self._buckets.get(model, {}).get(name)
+            if bucket is None:
+                continue
+            if block:
+                bucket.acquire(amount)
+            elif bucket.try_acquire(amount):
+                taken.append((bucket, amount))
+            else:
+                break
+        else:
+            if self._slots is None or self._slots.acquire(blocking=block):
+                return True
+        for bucket, amount in taken:
+            bucket.refund(amount)
+        return False
+
+    def _send(self, fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+        """Make an admitted request and free its slot."""
+        try:
+            return fn(**kwargs)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def _hedged(self, fn: Callable[..., Any], kwargs: Dict[str, Any], model: str, cost: int) -> Any:
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="openai-hedge")
+            pool = self._hedge_pool
+        first = pool.submit(self._send, fn, kwargs)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done or not self._admit(model, cost, block=False):
+            return first.result()
+        self.hedges += 1
+        pending = {first, pool.submit(self._send, fn, kwargs)}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    @staticmethod
+    def _retryable(e: Exception) -> bool:
+        if isinstance(e, (openai.APIConnectionError, httpx.TransportError)):
+            return True
+        return getattr(e, "status_code", None) in RETRY_STATUSES
+
+    @staticmethod
+    def _retry_after(e: Exception) -> Optional[float]:
+        response = getattr(e, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            if "retry-after" in headers:
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+        return None
@@ -0,0 +1,122 @@
+# src/orchestrai/memory/prompt_assembler.py
+
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.tokenizers import CachedTokenizer, CharEstimateTokenizer, Tokenizer
+
+Entry = Tuple[str, str, Dict[str, Any]]
+
+# Memory sections in prompt order
+SECTIONS = ("system", "summary", "semantic", "recency")
+DEFAULT_BUDGETS: Dict[str, int] = {"system": 500, "summary": 500, "semantic": 1000, "recency": 1500}
+ROLES = ("system", "user", "assistant")
+# Tokens the chat format adds around every message
+MESSAGE_OVERHEAD = 4
+
+
+class AssembledPrompt(NamedTuple):
+    """
+    The chat messages to send, their token count, and how many tokens the
+    duplicate and over-budget memory entries left out would have cost.
+    """
+    messages: List[Dict[str, str]]
+    prompt_tokens: int
+    tokens_saved: int
+
+
+def query_text(messages: Sequence[Dict[str, str]]) -> str:
+    """The last user message's content, used as the semantic query."""
+    for msg in reversed(messages):
+        if msg.get("role") == "user":
+            return msg.get("content") or ""
+    return ""
+
+
+def memory_sections(memory: MemoryStore, query: str, top_k: int = 10) -> Dict[str, List[Entry]]:
+    """
+    Fetch memory context for `query` split into prompt sections. A store
+    with `query_sources` (CompositeMemoryStore) is queried once through it,
+    so its timeout and KV tier apply: KV facts fill "system" as
+    "key: value" lines, semantic and recency hits their own sections. Any
+    other store fills only "recency". Summaries (entries with
+    "summary_level" metadata) move to their own section.
+    """
+    if hasattr(memory, "query_sources"):
+        hits = memory.query_sources(query, top_k, use_semantic=bool(query))
+        fetched = {
+            "system": [(key, f"{key}: {content}", meta) for (key, content, meta), _ in hits.get("kv", [])],
+            "semantic": [entry for entry, _ in hits.get("semantic", [])],
+            # recency hits come newest first
+            "recency": [entry for entry, _ in reversed(hits.get("recency", []))],
+        }
+    else:
+        fetched = {"recency": memory.query("", top_k)}
+
+    sections: Dict[str, List[Entry]] = {name: [] for name in SECTIONS}
+    for name, entries in fetched.items():
+        for entry in entries:
+            meta = entry[2] or {}
+            if "summary_level" in meta:
+                sections["summary"].append(entry)
+            else:
+                sections[name].append(entry)
+    return sections
+
+
+class PromptAssembler:
+    """
+    Builds the chat payload from memory sections and the new messages.
+
+    The new messages are always sent. Memory entries repeating one of
+    them, or an entry of an earlier section, are dropped; each section
+    then keeps entries within its own token budget from `budgets`
+    (missing sections use DEFAULT_BUDGETS): "semantic" keeps its best
+    hits, the other sections their newest entries. Kept entries appear
+    in chronological order, sections in SECTIONS order, before the new
+    messages. Token counts go through a cached `tokenizer`.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, int]] = None,
+        tokenizer: Optional[Tokenizer] = None,
+        cache_size: int = 4096,
+    ):
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.tokenizer = CachedTokenizer(tokenizer or CharEstimateTokenizer(), maxsize=cache_size)
+
+    def assemble(
+        self, sections: Mapping[str, Sequence[Entry]], messages: Sequence[Dict[str, str]]
+    ) -> AssembledPrompt:
+        seen = {(msg.get("role"), msg.get("content")) for msg in messages}
+        total = sum(self._tokens(msg.get("content") or "") for msg in messages)
+        candidate_tokens = total
+        context: List[Dict[str, str]] = []
+
+        for name in SECTIONS:
+            entries = sections.get(name) or []
+            if name != "semantic":
+                # budget goes to the newest entries
+                entries = entries[::-1]
+            budget = self.budgets.get(name, 0)
+            kept: List[Dict[str, str]] = []
+            used = 0
+            for role, content, _ in entries:
+                role = role if role in ROLES else "system"
+                tokens = self._tokens(content)
+                candidate_tokens += tokens
+                if (role, content) in seen or used + tokens > budget:
+                    continue
+                seen.add((role, content))
+                used += tokens
+                kept.append({"role": role, "content": content})
+            if name != "semantic":
+                kept.reverse()
+            context.extend(kept)
+            total += used
+
+        return AssembledPrompt(context + list(messages), total, candidate_tokens - total)
+
+    def _tokens(self, text: str) -> int:
+        return self.tokenizer.count(text) + MESSAGE_OVERHEAD
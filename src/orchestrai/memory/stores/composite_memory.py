@@ -1,32 +1,78 @@
 # src/orchestrai/memory/stores/composite_memory.py
 
-from typing import List, Tuple, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import islice
+from typing import List, Tuple, Dict, Any, Callable, Optional
 from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.fusion import FusionStrategy, Hits, ReciprocalRankFusion
 
 
 class CompositeMemoryStore(MemoryStore):
+    """
+    Combines a recency store, a semantic store and an optional key-value
+    store of exact facts (a KeyValueStore or one of its namespaces).
+
+    The KV tier is consulted first, in the calling thread: if the query
+    is itself a stored key, that fact is returned alone without touching
+    the other stores (so no embedding call is made) unless
+    `kv_short_circuit` is False. Otherwise keys starting with the query
+    join the fused results as the "kv" source.
+
+    `query` asks every enabled sub-store at once on a small thread pool,
+    so latency is that of the slowest backend rather than the sum, and
+    merges their hits with `fusion` (reciprocal rank fusion by default).
+    A sub-store that fails or takes longer than `timeout` seconds is left
+    out of the result instead of failing or blocking the query; its error
+    is kept in `last_errors` under "kv", "semantic" or "recency".
+    `query_sources` runs the same retrieval but returns each source's
+    hits unfused, e.g. to place them in different prompt sections.
+    """
+
     def __init__(
         self,
         recency_store: MemoryStore,
         semantic_store: MemoryStore,
         kv_store: Optional[Any] = None,
+        fusion: Optional[FusionStrategy] = None,
+        timeout: Optional[float] = None,
+        max_workers: int = 4,
+        kv_short_circuit: bool = True,
     ):
         self.recency = recency_store
         self.semantic = semantic_store
         self.kv = kv_store
+        self.fusion = fusion or ReciprocalRankFusion()
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.kv_short_circuit = kv_short_circuit
+        self.last_errors: Dict[str, BaseException] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
 
     def add(self, key: str, value: str, metadata: Dict[str, Any] = None) -> None:
         self.recency.add(key, value, metadata)
         self.semantic.add(key, value, metadata)
 
+    def kv_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an exact fact in the KV tier."""
+        self._require_kv().set(key, value, ttl=ttl)
+
+    def kv_get(self, key: str, default: Any = None) -> Any:
+        """Look up an exact fact, or `default` if it is missing."""
+        value = self._require_kv().get(key)
+        return default if value is None else value
+
+    def kv_delete(self, key: str) -> None:
+        self._require_kv().delete(key)
+
+    def kv_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """(key, value) facts whose key starts with `prefix`, in key order."""
+        return list(islice(self._require_kv().scan(prefix), limit))
+
     def query_semantic(self, query: str, top_k: int = 5) -> List[Tuple[str, str, Dict[str, Any]]]:
         """Retrieve top-k semantically relevant memory entries."""
-        results = []
-        raw = self.semantic.query(query, top_k)
-        for key, meta in raw:
-            content = meta.get("text", "")
-            results.append((key, content, meta or {}))
-        return results
+        return [entry for entry, _ in self._semantic_hits(query, top_k)]
 
     def query_recency(self, top_k: int = 5) -> List[Tuple[str, str, Dict[str, Any]]]:
         """Retrieve top-k most recent memory entries."""
@@ -37,30 +83,128 @@ class CompositeMemoryStore(MemoryStore):
         query: str,
         top_k: int = 5,
         use_semantic: bool = True,
-        use_recency: bool = True
+        use_recency: bool = True,
+        timeout: Optional[float] = None,
+        use_kv: bool = True,
     ) -> List[Tuple[str, str, Dict[str, Any]]]:
         """
-        Retrieve both semantic + recency entries, de-duplicated by key.
+        Retrieve the top-k KV + semantic + recency entries, fused and
+        de-duplicated by key. `timeout` overrides the store's default.
         """
-        merged = []
-        seen_keys = set()
+        results = self.query_sources(
+            query, top_k, use_semantic, use_recency, timeout, use_kv, short_circuit=self.kv_short_circuit
+        )
+        return self.fusion.fuse(results, top_k)
 
-        if use_semantic:
-            for key, content, meta in self.query_semantic(query, top_k):
-                if key not in seen_keys:
-                    merged.append((key, content, meta))
-                    seen_keys.add(key)
+    def query_sources(
+        self,
+        query: str,
+        top_k: int = 5,
+        use_semantic: bool = True,
+        use_recency: bool = True,
+        timeout: Optional[float] = None,
+        use_kv: bool = True,
+        short_circuit: bool = False,
+    ) -> Dict[str, Hits]:
+        """
+        Each source's top-k hits for `query`, unfused, under "kv" (an
+        exact match first, then keys starting with the query),
+        "semantic" and "recency" (newest first). Failed or timed-out
+        sources are left out, as in `query`. With `short_circuit`, an
+        exact KV match is returned alone.
+        """
+        results: Dict[str, Hits] = {}
+        kv_errors: Dict[str, BaseException] = {}
+        if use_kv and self.kv is not None and query:
+            try:
+                exact = self.kv.get(query)
+                if exact is not None and short_circuit:
+                    self.last_errors = {}
+                    return {"kv": [(self._kv_entry(query, exact), None)]}
+                hits = [] if exact is None else [(self._kv_entry(query, exact), None)]
+                hits += [
+                    (self._kv_entry(key, value), None)
+                    for key, value in self.kv_prefix(query, top_k)
+                    if key != query
+                ]
+            except Exception as e:
+                kv_errors["kv"] = e
+            else:
+                if hits:
+                    results["kv"] = hits[:top_k]
 
+        sources: Dict[str, Callable[[], Hits]] = {}
+        if use_semantic:
+            sources["semantic"] = lambda: self._semantic_hits(query, top_k)
         if use_recency:
-            for key, content, meta in self.query_recency(top_k):
-                if key not in seen_keys:
-                    merged.append((key, content, meta))
-                    seen_keys.add(key)
+            # newest first, so rank reflects recency
+            sources["recency"] = lambda: [(entry, None) for entry in reversed(self.query_recency(top_k))]
+
+        fanned, errors = self._fan_out(sources, self.timeout if timeout is None else timeout)
+        results.update(fanned)
+        self.last_errors = {**kv_errors, **errors}
+        return results
 
-        return merged
-    
     def summarize(self) -> None:
         """
         No-op: this store doesn’t support summarization.
         """
         pass
+
+    def close(self) -> None:
+        """
+        Shut down the query thread pool without waiting for stragglers.
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _require_kv(self) -> Any:
+        if self.kv is None:
+            raise ValueError("CompositeMemoryStore was created without a kv_store")
+        return self.kv
+
+    @staticmethod
+    def _kv_entry(key: str, value: Any) -> Tuple[str, str, Dict[str, Any]]:
+        content = value if isinstance(value, str) else str(value)
+        return (key, content, {"source": "kv", "value": value})
+
+    def _semantic_hits(self, query: str, top_k: int) -> Hits:
+        if hasattr(self.semantic, "query_with_scores"):
+            raw = self.semantic.query_with_scores(query, top_k)
+        else:
+            raw = [(key, meta, None) for key, meta in self.semantic.query(query, top_k)]
+        hits = []
+        for key, meta, score in raw:
+            meta = meta or {}
+            content = meta.get("text", meta.get("content", ""))
+            hits.append(((key, content, meta), score))
+        return hits
+
+    def _fan_out(
+        self, sources: Dict[str, Callable[[], Hits]], timeout: Optional[float]
+    ) -> Tuple[Dict[str, Hits], Dict[str, BaseException]]:
+        if not sources:
+            return {}, {}
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="composite-memory"
+                )
+            futures = {self._executor.submit(fetch): name for name, fetch in sources.items()}
+        done, _ = wait(futures, timeout=timeout)
+
+        # dict order keeps the sources' order for fusion tie-breaks
+        results: Dict[str, Hits] = {}
+        errors: Dict[str, BaseException] = {}
+        for future, name in futures.items():
+            if future not in done:
+                # a running call can't be interrupted; its result is dropped
+                future.cancel()
+                errors[name] = TimeoutError(f"{name} store did not answer within {timeout}s")
+            elif future.exception() is not None:
+                errors[name] = future.exception()
+            else:
+                results[name] = future.result()
+        return results, errors
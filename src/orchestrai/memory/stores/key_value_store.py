@@ -1,55 +1,623 @@
 # src/orchestrai/memory/stores/key_value_store.py
 
+import math
 import sqlite3
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from orchestrai.memory.codecs import (
+    CODECS_BY_TAG,
+    COMPRESSORS_BY_FLAG,
+    Codec,
+    Compressor,
+    JSONCodec,
+    make_compressor,
+)
+
+DURABILITY_PROFILES = ("full", "wal")
+
+# Value type tags stored in the vtype column; NULL means TEXT, as in
+# tables written before typed values existed. Structured values use the
+# codec's type_tag, and a compressor's flag is OR-ed in.
+TYPE_TEXT = 0
+TYPE_INT = 1
+TYPE_FLOAT = 2
+TYPE_BOOL = 3
+TYPE_BYTES = 4
+_BASE_MASK = 0x0F
+_COMPRESSION_MASK = 0xF0
+
+# Separates a namespace from the keys inside it
+NAMESPACE_SEP = "\x1f"
+
+# SQLite's default limit on host parameters is 999 on older builds
+_IN_CHUNK = 500
+# Rows removed per statement by sweep_expired, so writers are not held up
+_SWEEP_CHUNK = 1000
+# Cached (value, expires_at) for keys known to be absent
+_ABSENT: Tuple[None, None] = (None, None)
+
+Items = Union[Mapping[str, Any], Iterable[Tuple[str, Any]]]
+
+
+def _prefix_upper(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with `prefix`."""
+    if not prefix or ord(prefix[-1]) >= 0x10FFFF:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
 
 class KeyValueStore:
     """
     A simple key/value store backed by SQLite.
+
+    By default every write is committed on its own. Bulk writes go through
+    `set_many`/`delete_many` (one statement, one commit) or a
+    `transaction()` block. With `group_commit_size` and/or
+    `group_commit_ms`, single writes are left pending and committed
+    together after that many writes or that many milliseconds, trading a
+    small window of durability for far fewer fsyncs.
+
+    `cache_size > 0` enables a read-through LRU cache of that many keys
+    (absent keys included). The store's own writes invalidate the keys
+    they touch; commits made by other processes sharing the file are
+    detected through `PRAGMA data_version` and drop the whole cache. That
+    check costs about as much as a point lookup. By default it runs once
+    per read, so cached reads are never stale; setting `version_check_ms`
+    runs it at most once per that many milliseconds instead, accepting up
+    to that much staleness with respect to other processes. An in-memory
+    database has no other writers and is never checked.
+
+    Keys may carry a TTL (seconds). Expired keys read as missing right
+    away and are deleted by `sweep_expired()`, which runs every
+    `sweep_interval` seconds when that is set. `namespace(name)` returns
+    a view whose keys are stored under a private prefix.
+
+    Values keep their type: str, int, float, bool and bytes are stored as
+    native SQLite values, anything else (dicts, lists, None) through
+    `codec` (compact JSON by default). With `compression`, encoded str,
+    bytes and structured values of at least `compress_threshold` bytes are
+    compressed when that makes them smaller. Values served from the cache
+    are shared objects and should not be mutated.
     """
 
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        durability: str = "full",
+        group_commit_size: Optional[int] = None,
+        group_commit_ms: Optional[float] = None,
+        cache_size: int = 0,
+        version_check_ms: float = 0.0,
+        sweep_interval: Optional[float] = None,
+        codec: Optional[Codec] = None,
+        compression: Optional[str] = None,
+        compress_threshold: int = 1024,
+    ):
         """
         Opens (or creates) the SQLite DB at db_path.
         If db_path=":memory:", uses an in-memory database.
+
+        durability="full" keeps SQLite's defaults (rollback journal,
+        synchronous=FULL); "wal" switches a file DB to write-ahead logging
+        with synchronous=NORMAL, which fsyncs only at checkpoints.
         """
-        self.conn = sqlite3.connect(db_path)
-        # Ensure the table exists
+        if durability not in DURABILITY_PROFILES:
+            raise ValueError(f"durability must be one of {DURABILITY_PROFILES}, got {durability!r}")
+        self.db_path = db_path
+        self.durability = durability
+        self.group_commit_size = group_commit_size
+        self.group_commit_ms = group_commit_ms
+        self.codec = codec or JSONCodec()
+        self.compressor: Optional[Compressor] = make_compressor(compression)
+        self.compress_threshold = compress_threshold
+        self._codecs: Dict[int, Codec] = {self.codec.type_tag: self.codec}
+        self._compressors: Dict[int, Compressor] = {}
+        if self.compressor is not None:
+            self._compressors[self.compressor.flag] = self.compressor
+
+        self._lock = threading.RLock()
+        self._tx_depth = 0
+        self._tx_owner: Optional[int] = None
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+
+        self.cache_size = cache_size
+        self.version_check_ms = version_check_ms
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Bumped whenever cached entries may have gone stale
+        self._cache_epoch = 0
+        self._seen_versions: Dict[int, Tuple[int, float]] = {}
+        # only another connection to the same file can commit behind our back
+        self._shared_db = bool(db_path) and db_path != ":memory:"
+
+        # The group-commit timer and the sweeper use it from their own threads
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        if durability == "wal":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Ensure the table exists; `value` has no declared type so SQLite
+        # keeps each value's storage class
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv_store "
+            "(key TEXT PRIMARY KEY, value, expires_at REAL, vtype INTEGER)"
+        )
+        columns = {row[1]: row[2].upper() for row in self.conn.execute("PRAGMA table_info(kv_store)")}
+        if "expires_at" not in columns:
+            self.conn.execute("ALTER TABLE kv_store ADD COLUMN expires_at REAL")
+        if "vtype" not in columns:
+            self.conn.execute("ALTER TABLE kv_store ADD COLUMN vtype INTEGER")
+        # Older tables declare `value TEXT`, which turns numbers into text
+        self._text_affinity = any(t in columns["value"] for t in ("CHAR", "CLOB", "TEXT"))
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS kv_store_expires_at ON kv_store (expires_at) "
+            "WHERE expires_at IS NOT NULL"
+        )
+        # Root keys only, so scans outside any namespace are a range over
+        # this index instead of a walk past every namespaced row; the
+        # WHERE clause must match _scan's filter for SQLite to use it
         self.conn.execute(
-            "CREATE TABLE IF NOT EXISTS kv_store (key TEXT PRIMARY KEY, value TEXT)"
+            "CREATE INDEX IF NOT EXISTS kv_store_root_keys ON kv_store (key, expires_at) "
+            "WHERE instr(key, char(31)) = 0"
         )
         self.conn.commit()
 
-    def set(self, key: str, value: str) -> None:
+        self.sweep_interval = sweep_interval
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if sweep_interval:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="kv-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """
-        Insert or update the given key with value.
+        Insert or update the given key with value, expiring after `ttl`
+        seconds if given.
         """
-        self.conn.execute(
-            "REPLACE INTO kv_store (key, value) VALUES (?, ?)",
-            (key, value),
-        )
-        self.conn.commit()
+        expires_at = time.time() + ttl if ttl is not None else None
+        stored, vtype = self._encode(value)
+        with self._lock:
+            self.conn.execute(
+                "REPLACE INTO kv_store (key, value, expires_at, vtype) VALUES (?, ?, ?, ?)",
+                (key, stored, expires_at, vtype),
+            )
+            self._invalidate((key,))
+            self._wrote(1)
 
-    def get(self, key: str) -> Optional[str]:
+    def set_many(self, items: Items, ttl: Optional[float] = None) -> None:
         """
-        Retrieve the value for a key, or None if missing.
+        Insert or update many keys with a single statement and commit.
         """
-        cur = self.conn.execute(
-            "SELECT value FROM kv_store WHERE key = ?", (key,)
-        )
-        row = cur.fetchone()
-        return row[0] if row else None
+        expires_at = time.time() + ttl if ttl is not None else None
+        rows = [
+            (key, *self._encode(value), expires_at)
+            for key, value in (items.items() if isinstance(items, Mapping) else items)
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "REPLACE INTO kv_store (key, value, vtype, expires_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._invalidate(key for key, _, _, _ in rows)
+            self._wrote(len(rows))
+
+    def get(self, key: str) -> Any:
+        """
+        Retrieve the value for a key, or None if missing or expired.
+        """
+        if self.cache_size > 0:
+            with self._reader() as conn:
+                self._check_version(conn)
+                with self._cache_lock:
+                    entry = self._cache.get(key)
+                    if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                        self._cache.move_to_end(key)
+                        self.hits += 1
+                        return entry[0]
+            return self._get_many([key], check_version=False)[0]
+        with self._reader() as conn:
+            cur = conn.execute(
+                "SELECT value, expires_at, vtype FROM kv_store WHERE key = ?", (key,)
+            )
+            row = cur.fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return self._decode(row[0], row[2])
+
+    def get_many(self, keys: Sequence[str]) -> List[Any]:
+        """
+        Retrieve values for many keys, in order (None where missing).
+        Keys not served by the cache are fetched with one IN (...) query
+        per 500 keys.
+        """
+        return self._get_many(keys)
+
+    def _get_many(self, keys: Sequence[str], check_version: bool = True) -> List[Any]:
+        # `get` has already checked data_version when it calls this
+        found: List[Any] = [None] * len(keys)
+        now = time.time()
+        with self._reader() as conn:
+            cold: Dict[str, List[int]] = {}
+            if self.cache_size > 0:
+                if check_version:
+                    self._check_version(conn)
+                with self._cache_lock:
+                    epoch = self._cache_epoch
+                    for i, key in enumerate(keys):
+                        entry = self._cache.get(key)
+                        if entry is None or (entry[1] is not None and entry[1] <= now):
+                            cold.setdefault(key, []).append(i)
+                            continue
+                        self._cache.move_to_end(key)
+                        self.hits += 1
+                        found[i] = entry[0]
+                    self.misses += sum(len(idx) for idx in cold.values())
+            else:
+                for i, key in enumerate(keys):
+                    cold.setdefault(key, []).append(i)
+            if not cold:
+                return found
+
+            fetched: Dict[str, Tuple[Any, Optional[float]]] = {}
+            missing = list(cold)
+            for start in range(0, len(missing), _IN_CHUNK):
+                chunk = missing[start:start + _IN_CHUNK]
+                for key, value, expires_at, vtype in conn.execute(
+                    "SELECT key, value, expires_at, vtype FROM kv_store "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ):
+                    if expires_at is None or expires_at > now:
+                        fetched[key] = (self._decode(value, vtype), expires_at)
+
+        for key, idx in cold.items():
+            value = fetched.get(key, _ABSENT)[0]
+            for i in idx:
+                found[i] = value
+        if self.cache_size > 0:
+            with self._cache_lock:
+                # a write or external commit since the lookup may have raced the read
+                if epoch == self._cache_epoch:
+                    for key in cold:
+                        self._cache[key] = fetched.get(key, _ABSENT)
+                        self._cache.move_to_end(key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return found
 
     def delete(self, key: str) -> None:
         """
         Remove a key (no-op if key not present).
         """
-        self.conn.execute("DELETE FROM kv_store WHERE key = ?", (key,))
-        self.conn.commit()
+        with self._lock:
+            self.conn.execute("DELETE FROM kv_store WHERE key = ?", (key,))
+            self._invalidate((key,))
+            self._wrote(1)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """
+        Remove many keys with a single statement and commit.
+        """
+        rows = [(key,) for key in keys]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany("DELETE FROM kv_store WHERE key = ?", rows)
+            self._invalidate(key for key, in rows)
+            self._wrote(len(rows))
 
     def keys(self) -> list[str]:
         """
-        List all keys currently stored.
+        List all live keys outside any namespace, in key order.
+        """
+        return [key for key, in self._scan_rows("", "", 500, "key")]
+
+    def scan(self, prefix: str = "", batch_size: int = 500) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield live (key, value) pairs whose key starts with `prefix`, in
+        key order, outside any namespace. Rows are read `batch_size` at a
+        time as range scans over the primary key, so memory stays bounded
+        and no lock is held between batches.
+        """
+        return self._scan("", prefix, batch_size)
+
+    def namespace(self, name: str) -> "KeyNamespace":
+        """
+        A view of this store whose keys live in namespace `name`, isolated
+        from the root keys and from other namespaces.
+        """
+        return KeyNamespace(self, name)
+
+    def sweep_expired(self) -> int:
         """
-        cur = self.conn.execute("SELECT key FROM kv_store")
-        return [row[0] for row in cur.fetchall()]
+        Delete expired keys in every namespace; returns how many were removed.
+        """
+        removed = 0
+        while True:
+            with self._lock:
+                cur = self.conn.execute(
+                    "DELETE FROM kv_store WHERE key IN ("
+                    "SELECT key FROM kv_store WHERE expires_at <= ? LIMIT ?)",
+                    (time.time(), _SWEEP_CHUNK),
+                )
+                if cur.rowcount <= 0:
+                    return removed
+                removed += cur.rowcount
+                self._wrote(cur.rowcount)
+            if cur.rowcount < _SWEEP_CHUNK:
+                return removed
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Cache hit/miss counters plus the overall hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._cache),
+        }
+
+    @contextmanager
+    def transaction(self) -> Iterator["KeyValueStore"]:
+        """
+        Group writes into one atomic commit; rolled back if the block
+        raises. Other threads' writes wait until the block ends. Nested
+        blocks join the outermost transaction.
+        """
+        with self._lock:
+            if self._tx_depth == 0:
+                self.flush()
+                self._tx_owner = threading.get_ident()
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._tx_owner = None
+                    self.conn.rollback()
+                    self._invalidate(None)
+                raise
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                self._tx_owner = None
+                self.conn.commit()
+
+    def flush(self) -> None:
+        """
+        Commit writes held back by group commit.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending and self._tx_depth == 0:
+                self.conn.commit()
+                self._pending = 0
+
+    def close(self) -> None:
+        """
+        Stop the sweeper, commit any pending writes and close the connection.
+        """
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+        self.flush()
+        with self._lock:
+            self.conn.close()
+
+    def _scan(self, namespace: str, prefix: str, batch_size: int) -> Iterator[Tuple[str, Any]]:
+        for key, value, vtype in self._scan_rows(namespace, prefix, batch_size, "key, value, vtype"):
+            yield key, self._decode(value, vtype)
+
+    def _scan_rows(self, namespace: str, prefix: str, batch_size: int, columns: str) -> Iterator[tuple]:
+        # Keys are stored as namespace + key; rows of nested namespaces
+        # (a separator after `namespace`) are skipped. At the root that is
+        # the kv_store_root_keys index's condition; inside a namespace the
+        # primary key range is filtered. `columns` starts with key, which
+        # is yielded without the namespace.
+        lower = namespace + prefix
+        upper = _prefix_upper(lower)
+        start = len(namespace)
+        if namespace:
+            nested, nested_params = "instr(substr(key, ?), char(31)) = 0", [start + 1]
+        else:
+            nested, nested_params = "instr(key, char(31)) = 0", []
+        op = ">="
+        while True:
+            sql = (
+                f"SELECT {columns} FROM kv_store WHERE key {op} ?"
+                + (" AND key < ?" if upper is not None else "")
+                + f" AND (expires_at IS NULL OR expires_at > ?) AND {nested}"
+                " ORDER BY key LIMIT ?"
+            )
+            params = [lower] + ([upper] if upper is not None else []) + [time.time(), *nested_params, batch_size]
+            with self._reader() as conn:
+                rows = conn.execute(sql, params).fetchall()
+            for row in rows:
+                yield (row[0][start:], *row[1:])
+            if len(rows) < batch_size:
+                return
+            lower, op = rows[-1][0], ">"
+
+    def _encode(self, value: Any) -> Tuple[Any, Optional[int]]:
+        # (stored value, vtype) for a Python value
+        if isinstance(value, str):
+            if self.compressor is None or len(value) < self.compress_threshold:
+                return value, None
+            return self._maybe_compress(value.encode("utf-8"), TYPE_TEXT, value)
+        if isinstance(value, bool):
+            return int(value), TYPE_BOOL
+        if isinstance(value, int):
+            # beyond SQLite's 64-bit integers, keep the digits
+            return (value if -(1 << 63) <= value < (1 << 63) else str(value)), TYPE_INT
+        if isinstance(value, float):
+            # a TEXT column would round it to 15 digits; SQLite stores NaN as NULL
+            exact = math.isfinite(value) and not self._text_affinity
+            return (value if exact else repr(value)), TYPE_FLOAT
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            data = bytes(value)
+            return self._maybe_compress(data, TYPE_BYTES, data)
+        data = self.codec.encode(value)
+        return self._maybe_compress(data, self.codec.type_tag, data)
+
+    def _maybe_compress(self, data: bytes, vtype: int, plain: Any) -> Tuple[Any, Optional[int]]:
+        if self.compressor is not None and len(data) >= self.compress_threshold:
+            packed = self.compressor.compress(data)
+            if len(packed) < len(data):
+                return packed, vtype | self.compressor.flag
+        return plain, vtype or None
+
+    def _decode(self, stored: Any, vtype: Optional[int]) -> Any:
+        if not vtype:
+            return stored
+        flag = vtype & _COMPRESSION_MASK
+        if flag:
+            stored = self._compressor_for(flag).decompress(stored)
+        base = vtype & _BASE_MASK
+        if base == TYPE_TEXT:
+            return stored.decode("utf-8") if isinstance(stored, bytes) else stored
+        if base == TYPE_INT:
+            return int(stored)
+        if base == TYPE_FLOAT:
+            return float(stored)
+        if base == TYPE_BOOL:
+            return bool(int(stored))
+        if base == TYPE_BYTES:
+            return bytes(stored)
+        return self._codec_for(base).decode(stored)
+
+    def _codec_for(self, tag: int) -> Codec:
+        codec = self._codecs.get(tag)
+        if codec is None:
+            if tag not in CODECS_BY_TAG:
+                raise ValueError(f"no codec registered for value type {tag}")
+            codec = self._codecs[tag] = CODECS_BY_TAG[tag]()
+        return codec
+
+    def _compressor_for(self, flag: int) -> Compressor:
+        compressor = self._compressors.get(flag)
+        if compressor is None:
+            if flag not in COMPRESSORS_BY_FLAG:
+                raise ValueError(f"unknown compression flag {flag:#x}")
+            compressor = self._compressors[flag] = COMPRESSORS_BY_FLAG[flag]()
+        return compressor
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            self.sweep_expired()
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        # Connection for read queries; the base store shares its writer
+        with self._lock:
+            yield self.conn
+
+    def _check_version(self, conn: sqlite3.Connection) -> None:
+        # data_version changes when another connection commits
+        if not self._shared_db:
+            return
+        seen = self._seen_versions.get(id(conn))
+        now = time.monotonic()
+        if seen is not None and now - seen[1] < self.version_check_ms / 1000:
+            return
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        self._seen_versions[id(conn)] = (version, now)
+        if seen is None or seen[0] != version:
+            self._invalidate(None)
+
+    def _invalidate(self, keys: Optional[Iterable[str]]) -> None:
+        # Drop `keys` from the cache, or everything when keys is None
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache_epoch += 1
+            if keys is None:
+                self._cache.clear()
+            else:
+                for key in keys:
+                    self._cache.pop(key, None)
+
+    def _wrote(self, n: int) -> None:
+        # Called with the lock held, after a write statement ran
+        if self._tx_depth:
+            return
+        if self.group_commit_size is None and self.group_commit_ms is None:
+            self.conn.commit()
+            return
+        self._pending += n
+        if self.group_commit_size is not None and self._pending >= self.group_commit_size:
+            self.flush()
+        elif self.group_commit_ms is not None and self._timer is None:
+            self._timer = threading.Timer(self.group_commit_ms / 1000, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+class KeyNamespace:
+    """
+    A namespace inside a KeyValueStore (see `KeyValueStore.namespace`).
+
+    Keys are stored as `name + NAMESPACE_SEP + key` and share the parent's
+    connection, cache, transactions and TTL handling. Namespaces nest.
+    """
+
+    def __init__(self, store: KeyValueStore, name: str, parent_prefix: str = ""):
+        if not name or NAMESPACE_SEP in name:
+            raise ValueError(f"invalid namespace name: {name!r}")
+        self.store = store
+        self.name = name
+        self.prefix = parent_prefix + name + NAMESPACE_SEP
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.store.set(self.prefix + key, value, ttl)
+
+    def set_many(self, items: Items, ttl: Optional[float] = None) -> None:
+        pairs = items.items() if isinstance(items, Mapping) else items
+        self.store.set_many(((self.prefix + key, value) for key, value in pairs), ttl)
+
+    def get(self, key: str) -> Any:
+        return self.store.get(self.prefix + key)
+
+    def get_many(self, keys: Sequence[str]) -> List[Any]:
+        return self.store.get_many([self.prefix + key for key in keys])
+
+    def delete(self, key: str) -> None:
+        self.store.delete(self.prefix + key)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        self.store.delete_many(self.prefix + key for key in keys)
+
+    def keys(self) -> list[str]:
+        return [key for key, in self.store._scan_rows(self.prefix, "", 500, "key")]
+
+    def scan(self, prefix: str = "", batch_size: int = 500) -> Iterator[Tuple[str, Any]]:
+        return self.store._scan(self.prefix, prefix, batch_size)
+
+    def namespace(self, name: str) -> "KeyNamespace":
+        return KeyNamespace(self.store, name, self.prefix)
+
+    def clear(self) -> int:
+        """
+        Delete every key in this namespace, nested namespaces included.
+        """
+        with self.store._lock:
+            cur = self.store.conn.execute(
+                "DELETE FROM kv_store WHERE key >= ? AND key < ?",
+                (self.prefix, _prefix_upper(self.prefix)),
+            )
+            self.store._invalidate(None)
+            self.store._wrote(max(cur.rowcount, 1))
+        return cur.rowcount
+
+    def transaction(self) -> ContextManager[KeyValueStore]:
+        return self.store.transaction()
@@ -0,0 +1,167 @@
+# src/orchestrai/memory/stores/pooled_key_value_store.py
+
+import asyncio
+import functools
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from orchestrai.memory.stores.key_value_store import Items, KeyValueStore
+
+T = TypeVar("T")
+
+
+class PooledKeyValueStore(KeyValueStore):
+    """
+    KeyValueStore for multi-threaded servers.
+
+    Writes go through one serialized writer connection (the inherited
+    `conn`); reads use a per-thread reader connection opened on first use,
+    so readers never wait on each other or on the writer. The database is
+    always opened in WAL mode, where readers see the last committed state
+    while a write is in progress. A thread inside `transaction()` reads
+    through the writer and therefore sees its own uncommitted writes.
+    A reader connection is closed when its thread exits, so short-lived
+    threads don't leak connections.
+
+    With group commit, writes wait uncommitted on the writer where reader
+    connections can't see them, so while any are pending every thread
+    reads through the writer, and the cache is cleared when they commit.
+
+    Requires a file path; an in-memory database cannot be shared between
+    connections. With `cache_size`, note that the writer's commits also
+    change each reader's `data_version`, so the shared cache is cleared
+    after every commit; it pays off for read-mostly workloads.
+    """
+
+    def __init__(self, db_path: str, **kwargs: Any):
+        if db_path == ":memory:" or not db_path:
+            raise ValueError("PooledKeyValueStore needs a file-backed database")
+        kwargs["durability"] = "wal"
+        super().__init__(db_path, **kwargs)
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    @property
+    def reader_count(self) -> int:
+        """Number of open reader connections (one per live reading thread)."""
+        return len(self._readers)
+
+    def close(self) -> None:
+        """
+        Commit pending writes and close the writer and every reader connection.
+        """
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        super().close()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending = self._pending and self._tx_depth == 0
+            super().flush()
+            if pending:
+                # values read from a reader just before the commit may be stale
+                self._invalidate(None)
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        if self._tx_owner == threading.get_ident() or self._pending:
+            with self._lock:
+                yield self.conn
+            return
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            # Only this thread uses it; close() may run on another thread
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA query_only=ON")
+            reader = _Reader(conn)
+            with self._readers_lock:
+                self._readers.append(conn)
+            # the thread's locals, and with them `reader`, go when it exits
+            weakref.finalize(reader, _close_reader, weakref.ref(self), conn)
+            self._local.reader = reader
+        yield reader.conn
+
+
+class _Reader:
+    """A thread's reader connection, held in the store's thread-local."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _close_reader(store_ref: "weakref.ref[PooledKeyValueStore]", conn: sqlite3.Connection) -> None:
+    store = store_ref()
+    if store is not None:
+        with store._readers_lock:
+            if conn in store._readers:
+                store._readers.remove(conn)
+    conn.close()
+
+
+class AsyncKeyValueStore:
+    """
+    asyncio facade over a (pooled) KeyValueStore.
+
+    Every call runs on a small thread pool so blocking SQLite work stays
+    off the event loop. With a PooledKeyValueStore each pool thread keeps
+    its own reader connection, so `max_workers` also bounds the number of
+    open connections.
+    """
+
+    def __init__(self, store: KeyValueStore, max_workers: int = 4):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kv-store")
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run `fn(*args, **kwargs)` on the store's thread pool, e.g. a
+        function that does several writes inside `store.transaction()`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def get(self, key: str) -> Any:
+        return await self.run(self.store.get, key)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Any]:
+        return await self.run(self.store.get_many, list(keys))
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.run(self.store.set, key, value, ttl)
+
+    async def set_many(self, items: Items, ttl: Optional[float] = None) -> None:
+        await self.run(self.store.set_many, items, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.run(self.store.delete, key)
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        await self.run(self.store.delete_many, list(keys))
+
+    async def keys(self) -> List[str]:
+        return await self.run(self.store.keys)
+
+    async def scan(self, prefix: str = "", limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Up to `limit` (key, value) pairs from `store.scan(prefix)`, collected off the loop."""
+        return await self.run(lambda: list(islice(self.store.scan(prefix), limit)))
+
+    async def sweep_expired(self) -> int:
+        return await self.run(self.store.sweep_expired)
+
+    async def flush(self) -> None:
+        await self.run(self.store.flush)
+
+    async def close(self) -> None:
+        """Close the underlying store and shut the thread pool down."""
+        await self.run(self.store.close)
+        self._executor.shutdown(wait=True)
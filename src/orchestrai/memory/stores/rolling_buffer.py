@@ -1,35 +1,146 @@
 # src/orchestrai/memory/stores/rolling_buffer.py
 
+import threading
+from bisect import bisect_left
 from collections import deque
-from typing import List, Tuple, Dict
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional
 
 from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.tokenizers import CharEstimateTokenizer, Tokenizer
+
+
+class BufferEntry(NamedTuple):
+    """
+    One buffered entry. A tuple subclass without a per-instance dict, so
+    it unpacks and compares like the plain (key, value, metadata) tuples
+    it replaces. The buffer stores None for missing metadata; entries
+    handed out always carry a dict.
+    """
+    key: str
+    value: str
+    metadata: Optional[Dict[str, Any]]
+
+
+def _with_metadata(entries: Iterable[BufferEntry]) -> List[BufferEntry]:
+    # a fresh {} per returned entry, so callers may mutate it
+    return [e if e.metadata is not None else e._replace(metadata={}) for e in entries]
+
 
 class RollingBufferStore(MemoryStore):
     """
     A fixed-size in-memory buffer: keeps only the last `max_size` entries.
+
+    Each entry's token count is computed once by `tokenizer` when it is
+    added and kept as a running prefix sum, so `query(max_tokens=N)` finds
+    the newest entries that fit in N tokens with a binary search.
+    `max_tokens` given here becomes the default budget for queries.
+    Safe to call from several threads.
     """
 
-    def __init__(self, max_size: int = 50):
-        self.buffer = deque(maxlen=max_size)
+    def __init__(
+        self,
+        max_size: int = 50,
+        max_tokens: Optional[int] = None,
+        tokenizer: Optional[Tokenizer] = None,
+    ):
+        self.buffer: Deque[BufferEntry] = deque(maxlen=max_size)
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer or CharEstimateTokenizer()
+        # _cum[i] = tokens of every entry added up to and including the
+        # i-th; live entries are _cum[_head:], _base is the sum before them
+        self._cum: List[int] = []
+        self._head = 0
+        self._base = 0
+        self._lock = threading.RLock()
 
     def add(self, key: str, value: str, metadata: Dict = None) -> None:
         """
-        Append a new (key, value, metadata) tuple.
+        Append a new (key, value, metadata) entry.
         Oldest entries drop off when capacity is exceeded.
         """
-        self.buffer.append((key, value, metadata or {}))
+        tokens = self.tokenizer.count(value)
+        with self._lock:
+            self._sync()
+            total = self._cum[-1] if self._cum else 0
+            self._cum.append(total + tokens)
+            self.buffer.append(BufferEntry(key, value, metadata))
+            self._sync()
 
-    def query(self, query: str, top_k: int = 5) -> List[Tuple[str, Dict]]:
+    def query(self, query: str, top_k: int = 5, max_tokens: Optional[int] = None) -> List[BufferEntry]:
         """
         Return the last `top_k` items in insertion order.
         (We ignore `query` for this simple strategy.)
+
+        With a token budget (`max_tokens`, or the store's default) only the
+        newest entries whose combined token count fits are returned.
+        Walks the deque from the right, so the cost is O(top_k) however
+        large the buffer is.
         """
-        items = list(self.buffer)
-        return items[-top_k:]
+        budget = max_tokens if max_tokens is not None else self.max_tokens
+        with self._lock:
+            if budget is not None:
+                top_k = min(top_k, self.count_within(budget))
+            if top_k <= 0:
+                return []
+            items = _with_metadata(islice(reversed(self.buffer), top_k))
+        items.reverse()
+        return items
+
+    def pop_oldest(self, n: int) -> List[BufferEntry]:
+        """
+        Remove and return the `n` oldest entries, oldest first.
+        """
+        with self._lock:
+            popped = [self.buffer.popleft() for _ in range(min(max(n, 0), len(self.buffer)))]
+            self._sync()
+        return _with_metadata(popped)
+
+    def peek_oldest(self, n: int) -> List[BufferEntry]:
+        """
+        The `n` oldest entries, oldest first, left in place.
+        """
+        with self._lock:
+            return _with_metadata(islice(self.buffer, max(n, 0)))
+
+    def count_within(self, max_tokens: int) -> int:
+        """
+        How many of the newest entries fit together in `max_tokens` tokens.
+        """
+        with self._lock:
+            self._sync()
+            if not self.buffer:
+                return 0
+            total = self._cum[-1]
+            need = total - max_tokens
+            if self._base >= need:
+                return len(self.buffer)
+            # first live prefix sum that leaves at most max_tokens after it
+            return max(0, len(self._cum) - 1 - bisect_left(self._cum, need, self._head))
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens across every buffered entry."""
+        with self._lock:
+            self._sync()
+            return (self._cum[-1] if self._cum else 0) - self._base
+
+    def __len__(self) -> int:
+        return len(self.buffer)
 
     def summarize(self) -> None:
         """
         No-op: this store doesn’t support summarization.
         """
         pass
+
+    def _sync(self) -> None:
+        # Entries only ever leave from the left (maxlen eviction or
+        # popleft), so drop that many prefix sums
+        dropped = len(self._cum) - self._head - len(self.buffer)
+        if dropped > 0:
+            self._head += dropped
+            self._base = self._cum[self._head - 1]
+            if self._head > 1024 and self._head * 2 > len(self._cum):
+                del self._cum[:self._head]
+                self._head = 0
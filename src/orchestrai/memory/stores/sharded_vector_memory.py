@@ -0,0 +1,203 @@
+# src/orchestrai/memory/stores/sharded_vector_memory.py
+
+import heapq
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.embedders import Embedder, OpenAIEmbedder
+from orchestrai.memory.embedding_cache import EmbeddingCache
+from orchestrai.memory.stores.vector_memory import Entry, VectorMemoryStore, iter_batches
+
+
+class ShardedVectorMemoryStore(MemoryStore):
+    """
+    Hash-partitions entries across `n_shards` VectorMemoryStore shards.
+
+    Texts are embedded once at this level (sharing one embedder and cache)
+    and each vector is routed to the shard chosen by a CRC32 of its key
+    and value, so conversational keys like "user" still spread evenly.
+    Queries fan out over a thread pool (FAISS releases the GIL while
+    searching) and the per-shard top-k lists are merged with a heap.
+    `delete`/`upsert` consult every shard, since a key can span shards.
+
+    `store_kwargs` configure each shard (index_type, metric, nprobe, ...).
+    """
+
+    def __init__(
+        self,
+        n_shards: int = 4,
+        embed_model: str = "text-embedding-ada-002",
+        dim: int = 1536,
+        client: Any = None,
+        embedder: Optional[Embedder] = None,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 128,
+        max_batch_tokens: int = 8000,
+        max_workers: Optional[int] = None,
+        **store_kwargs: Any,
+    ):
+        self.embedder = embedder or OpenAIEmbedder(embed_model, dim, client)
+        self.embed_model = self.embedder.model
+        self.dim = self.embedder.dim
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.store_kwargs = store_kwargs
+        self.shards: List[VectorMemoryStore] = [self._new_shard() for _ in range(n_shards)]
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or n_shards, thread_name_prefix="vector-shard"
+        )
+
+    def add(self, key: str, value: str, metadata: Dict[str, Any] = None) -> None:
+        self.add_many([(key, value, metadata)])
+
+    def add_many(self, entries: Iterable[Entry]) -> None:
+        """Embed entries in request-sized batches and route each vector to its shard."""
+        for batch in iter_batches(entries, self.batch_size, self.max_batch_tokens):
+            self._route(batch)
+
+    def upsert(self, key: str, value: str, metadata: Dict[str, Any] = None) -> None:
+        self.upsert_many([(key, value, metadata)])
+
+    def upsert_many(self, entries: Iterable[Entry]) -> None:
+        """Replace every entry stored under each key; if a key repeats, its last entry wins."""
+        latest = {entry[0]: entry for entry in entries}
+        for batch in iter_batches(latest.values(), self.batch_size, self.max_batch_tokens):
+            for key, _, _ in batch:
+                self.delete(key)
+            self._route(batch)
+
+    def delete(self, key: str) -> int:
+        return sum(shard.delete(key) for shard in self.shards)
+
+    def query(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        **search_kwargs: Any,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        return [
+            (key, meta)
+            for key, meta, _ in self.query_with_scores(query, top_k, filter, **search_kwargs)
+        ]
+
+    def query_with_scores(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Search every shard concurrently and merge their scored top-k lists."""
+        return self.query_many_with_scores([query], top_k, filter, min_score, nprobe, ef_search)[0]
+
+    def query_many(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        **search_kwargs: Any,
+    ) -> List[List[Tuple[str, Dict[str, Any]]]]:
+        return [
+            [(key, meta) for key, meta, _ in hits]
+            for hits in self.query_many_with_scores(queries, top_k, filter, **search_kwargs)
+        ]
+
+    def query_many_with_scores(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """Embed all queries once, run one batched search per shard and merge per query."""
+        if not queries:
+            return []
+        qvecs = self.shards[0]._prepare(self._embed(list(queries)))
+        futures = [
+            self._pool.submit(shard._query_vectors, qvecs, top_k, filter, min_score, nprobe, ef_search)
+            for shard in self.shards
+        ]
+        per_shard = [f.result() for f in futures]
+        return [
+            list(islice(heapq.merge(*rows, key=lambda hit: -hit[2]), top_k))
+            for rows in zip(*per_shard)
+        ]
+
+    def summarize(self) -> None:
+        # No-op for this store
+        pass
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def wait_for_index(self) -> None:
+        for shard in self.shards:
+            shard.wait_for_index()
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+        self._pool.shutdown(wait=True)
+
+    def save(self, path: str, **save_kwargs: Any) -> None:
+        """Snapshot every shard into `path/shard-<i>` (see VectorMemoryStore.save)."""
+        path = os.path.abspath(path)
+        os.makedirs(path, exist_ok=True)
+        list(self._pool.map(
+            lambda i: self.shards[i].save(os.path.join(path, f"shard-{i}"), **save_kwargs),
+            range(len(self.shards)),
+        ))
+        manifest_file = os.path.join(path, "shards.json")
+        with open(manifest_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"n_shards": len(self.shards), "embed_model": self.embed_model, "dim": self.dim}, f)
+        os.replace(manifest_file + ".tmp", manifest_file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, **kwargs: Any) -> "ShardedVectorMemoryStore":
+        """Open a snapshot written by `save`; each shard is loaded (and memory-mapped) in parallel."""
+        path = os.path.abspath(path)
+        with open(os.path.join(path, "shards.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        kwargs.setdefault("embed_model", manifest["embed_model"])
+        kwargs.setdefault("dim", manifest["dim"])
+        store = cls(n_shards=manifest["n_shards"], **kwargs)
+        store.shards = list(store._pool.map(
+            lambda i: VectorMemoryStore.load(
+                os.path.join(path, f"shard-{i}"), mmap=mmap,
+                embedder=store.embedder, cache=store.cache, **store.store_kwargs,
+            ),
+            range(manifest["n_shards"]),
+        ))
+        return store
+
+    def _new_shard(self) -> VectorMemoryStore:
+        return VectorMemoryStore(embedder=self.embedder, cache=self.cache, **self.store_kwargs)
+
+    def _shard_of(self, key: str, value: str) -> int:
+        return zlib.crc32(f"{key}\0{value}".encode("utf-8")) % len(self.shards)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self.cache is None:
+            return self.embedder.embed(texts)
+        return self.cache.embed(self.embedder, texts)
+
+    def _route(self, batch: List[Entry]) -> None:
+        vecs = self.shards[0]._prepare(self._embed([value for _, value, _ in batch]))
+        by_shard: Dict[int, List[int]] = {}
+        for i, (key, value, _) in enumerate(batch):
+            by_shard.setdefault(self._shard_of(key, value), []).append(i)
+        for shard_no, rows in by_shard.items():
+            self.shards[shard_no]._add_vectors([batch[i] for i in rows], vecs[rows])
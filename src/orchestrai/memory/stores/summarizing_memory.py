@@ -1,11 +1,65 @@
+import queue
+import threading
+from collections import deque
+
 import openai
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional, Deque
 from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.tokenizers import CharEstimateTokenizer, Tokenizer
+
+SUMMARIZE_PROMPT = "You are a summarizer. Condense the following conversation into one concise statement:"
+MERGE_PROMPT = (
+    "You are a summarizer. Merge the following summaries of consecutive parts "
+    "of a conversation into one concise summary:"
+)
+
+
+def _require_oldest_api(inner: MemoryStore) -> None:
+    for name in ("pop_oldest", "peek_oldest"):
+        if getattr(type(inner), name, None) in (None, getattr(MemoryStore, name)):
+            raise TypeError(f"{type(inner).__name__} does not support {name}")
+
+
+def _as_entry(hit: Tuple) -> Tuple[str, str, Dict[str, Any]]:
+    # Stores answer with (key, content, metadata) or, like VectorMemoryStore,
+    # (key, metadata) carrying the text in "content"/"text"
+    if len(hit) == 3:
+        return tuple(hit)
+    key, meta = hit
+    meta = meta or {}
+    return key, meta.get("content", meta.get("text", "")), meta
+
+
+def complete_summary(client: Any, model: str, instruction: str, text: str, **kwargs: Any) -> str:
+    """One chat completion: `instruction` as the system message, `text` as the user message."""
+    sys_msg = {"role": "system", "content": instruction}
+    user_msg = {"role": "user", "content": text}
+    resp = (client or openai).chat.completions.create(
+        model=model,
+        messages=[sys_msg, user_msg],
+        **kwargs,
+    )
+    return resp.choices[0].message.content
+
 
 class SummarizingMemoryStore(MemoryStore):
     """
-    Wraps another MemoryStore and auto-summarizes old entries when the 
+    Wraps another MemoryStore and auto-summarizes old entries when the
     count exceeds a threshold.
+
+    With `background=True`, `add` only schedules the summary: a worker
+    thread calls the LLM and then, under the store lock, removes the
+    summarized chunk and adds the summary in one step, so queries never
+    see a half-applied swap. At most `max_pending` summaries wait in the
+    queue; beyond that `add` blocks until the worker catches up. `flush()`
+    waits for every scheduled summary (and re-raises a worker error).
+
+    Chunks are always the oldest entries, read with `inner.peek_oldest`
+    and removed with `inner.pop_oldest` once summarized, so `inner` must
+    support both (RollingBufferStore and VectorMemoryStore do).
+
+    `client` is anything exposing `chat.completions.create`; it defaults
+    to the `openai` module.
     """
     def __init__(
         self,
@@ -14,7 +68,11 @@ class SummarizingMemoryStore(MemoryStore):
         chunk_size: int = 5,
         model: str = "gpt-4o-mini",
         summarizer_kwargs: Dict[str, Any] = None,
+        client: Any = None,
+        background: bool = False,
+        max_pending: int = 4,
     ):
+        _require_oldest_api(inner)
         self.inner = inner
         self.threshold = threshold
         self.chunk_size = chunk_size
@@ -23,44 +81,251 @@ class SummarizingMemoryStore(MemoryStore):
             "temperature": 0.3,
             # you can add max_tokens, top_p, etc.
         }
+        self.client = client
+        self.background = background
+        self.max_pending = max_pending
+
+        self._lock = threading.RLock()
+        # Oldest entries already handed to the worker
+        self._in_flight = 0
+        self._jobs: "queue.Queue[Optional[List[Tuple]]]" = queue.Queue(maxsize=max_pending)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_error: Optional[BaseException] = None
 
     def add(self, key: str, value: str, metadata: Dict = None) -> None:
-        # 1) Add to inner store
-        self.inner.add(key, value, metadata)
+        if self.background:
+            self._add_background(key, value, metadata)
+            return
 
-        # 2) If we exceed the threshold, summarize the oldest chunk_size entries
-        entries = self.inner.query("", top_k=self.threshold + 1)
-        if len(entries) > self.threshold:
-            # Extract the oldest entries
-            old_entries = entries[: self.chunk_size]
-            text_to_summarize = "\n".join(
-                f"{role}: {content}" for (role, content, _) in old_entries
-            )
+        with self._lock:
+            # 1) Add to inner store
+            self.inner.add(key, value, metadata)
 
-            # 3) Call OpenAI to summarize
-            sys_msg = {
-                "role": "system",
-                "content": "You are a summarizer. Condense the following conversation into one concise statement:",
-            }
-            user_msg = {"role": "user", "content": text_to_summarize}
-            resp = openai.chat.completions.create(
-                model=self.model,
-                messages=[sys_msg, user_msg],
-                **self.summarizer_kwargs,
-            )
-            summary = resp.choices[0].message.content
+            # 2) If we exceed the threshold, summarize the oldest chunk_size entries
+            if len(self.inner) > self.threshold:
+                # Extract the oldest entries
+                old_entries = self.inner.peek_oldest(self.chunk_size)
 
-            # 4) Remove the old entries from the inner buffer (if it’s a deque)
-            if hasattr(self.inner, "buffer"):
-                for _ in range(self.chunk_size):
-                    self.inner.buffer.popleft()
+                # 3) Call OpenAI to summarize
+                summary = self._summarize_entries(old_entries)
 
-            # 5) Add the summary back as a system message
-            self.inner.add("system", summary)
+                # 4) Remove the old entries and add the summary as a system message
+                self._replace(old_entries, summary)
 
     def query(self, query: str, top_k: int = 5) -> List[Tuple[str, Dict]]:
-        return self.inner.query(query, top_k)
+        with self._lock:
+            return self.inner.query(query, top_k)
 
     def summarize(self) -> None:
         # Expose manual summarization if needed
         pass
+
+    def flush(self) -> None:
+        """
+        Block until every scheduled summary has been applied.
+        """
+        if self._worker is not None:
+            self._jobs.join()
+        if self._worker_error is not None:
+            error, self._worker_error = self._worker_error, None
+            raise error
+
+    def close(self) -> None:
+        """
+        Apply pending summaries and stop the worker thread.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._worker is not None:
+                self._jobs.put(None)
+                self._worker.join()
+                self._worker = None
+
+    def _add_background(self, key: str, value: str, metadata: Dict = None) -> None:
+        if self._worker_error is not None:
+            self.flush()
+        with self._lock:
+            self.inner.add(key, value, metadata)
+            # The first `_in_flight` entries at the head are already queued
+            # and don't count toward the threshold; the next chunk follows
+            # them (summaries are appended at the tail, never in between)
+            if len(self.inner) - self._in_flight <= self.threshold:
+                return
+            chunk = self.inner.peek_oldest(self._in_flight + self.chunk_size)[self._in_flight:]
+            self._in_flight += len(chunk)
+            self._ensure_worker()
+        # outside the lock: the worker needs it to apply earlier summaries
+        self._jobs.put(chunk)
+
+    def _summarize_entries(self, entries: List[Tuple]) -> str:
+        text_to_summarize = "\n".join(
+            f"{role}: {content}" for (role, content, _) in entries
+        )
+        return complete_summary(
+            self.client, self.model, SUMMARIZE_PROMPT, text_to_summarize, **self.summarizer_kwargs
+        )
+
+    def _replace(self, entries: List[Tuple], summary: str) -> bool:
+        """
+        Swap the chunk at the head of `inner` for its summary. A bounded
+        buffer may have evicted the chunk's first entries meanwhile, so
+        whatever is left of it at the head is removed; if nothing is, the
+        summary is dropped and False returned.
+        """
+        entries = list(entries)
+        with self._lock:
+            head = list(self.inner.peek_oldest(len(entries)))
+            n = 0
+            for skip in range(len(entries)):
+                rest = entries[skip:]
+                if head[: len(rest)] == rest:
+                    n = len(rest)
+                    break
+            if n == 0:
+                return False
+            self.inner.pop_oldest(n)
+
+            # Add the summary back as a system message; "content" keeps its
+            # text in stores that only return metadata (VectorMemoryStore)
+            self.inner.add("system", summary, {"content": summary, "summary_level": 0})
+            return True
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._drain, name="summarizing-memory", daemon=True
+            )
+            self._worker.start()
+
+    def _drain(self) -> None:
+        while True:
+            chunk = self._jobs.get()
+            try:
+                if chunk is None:
+                    return
+                try:
+                    summary = self._summarize_entries(chunk)
+                except BaseException as e:
+                    self._worker_error = e
+                    with self._lock:
+                        # the chunk stays in place and can be retried
+                        self._in_flight -= len(chunk)
+                    continue
+                with self._lock:
+                    self._replace(chunk, summary)
+                    self._in_flight -= len(chunk)
+            finally:
+                self._jobs.task_done()
+
+
+class HierarchicalSummarizingMemoryStore(MemoryStore):
+    """
+    Rolling-tree summarization over any inner store supporting
+    `peek_oldest` and `pop_oldest`.
+
+    Once more than `threshold` raw entries sit in `inner`, the oldest run
+    of entries fitting in `chunk_tokens` tokens (leaving at least
+    `threshold // 2` raw entries) is condensed into a level-0 summary and
+    only then popped, so a failed LLM call loses nothing. When `fanout`
+    summaries accumulate on a level they are merged into one summary on
+    the next level up. Entry and token counts are tracked here rather than
+    re-queried, so each add costs amortized O(1) LLM calls: one per chunk
+    plus 1/(fanout - 1) for merges.
+
+    `query` returns at most `top_k` (key, content, metadata) entries: the
+    summaries, oldest (highest level) first, as ("system", summary,
+    {"summary_level": level}), then the inner store's results for the
+    remaining slots. There are at most fanout - 1 summaries per level.
+    """
+
+    def __init__(
+        self,
+        inner: MemoryStore,
+        threshold: int = 20,
+        chunk_tokens: int = 1000,
+        fanout: int = 4,
+        model: str = "gpt-4o-mini",
+        summarizer_kwargs: Dict[str, Any] = None,
+        client: Any = None,
+        tokenizer: Optional[Tokenizer] = None,
+    ):
+        _require_oldest_api(inner)
+        if fanout < 2:
+            raise ValueError("fanout must be at least 2")
+        self.inner = inner
+        self.threshold = threshold
+        self.chunk_tokens = chunk_tokens
+        self.fanout = fanout
+        self.model = model
+        self.summarizer_kwargs = summarizer_kwargs or {"temperature": 0.3}
+        self.client = client
+        self.tokenizer = tokenizer or CharEstimateTokenizer()
+        # levels[0] summarizes raw chunks, levels[i + 1] merges levels[i]
+        self.levels: List[List[str]] = []
+        self.llm_calls = 0
+        # Token count of each raw entry in `inner`, oldest first
+        self._tokens: Deque[int] = deque()
+
+    def add(self, key: str, value: str, metadata: Dict = None) -> None:
+        self.inner.add(key, value, metadata)
+        self._tokens.append(self.tokenizer.count(value))
+        if hasattr(self.inner, "__len__"):
+            # the inner store may have evicted entries on its own
+            while len(self._tokens) > len(self.inner):
+                self._tokens.popleft()
+        while len(self._tokens) > self.threshold:
+            self._compact()
+
+    def query(self, query: str, top_k: int = 5) -> List[Tuple[str, str, Dict[str, Any]]]:
+        summaries = self.summaries()[:max(top_k, 0)]
+        remaining = top_k - len(summaries)
+        if remaining <= 0:
+            return summaries
+        return summaries + [_as_entry(hit) for hit in self.inner.query(query, remaining)]
+
+    def summaries(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Every current summary as a system entry, oldest first."""
+        return [
+            ("system", summary, {"summary_level": level})
+            for level in range(len(self.levels) - 1, -1, -1)
+            for summary in self.levels[level]
+        ]
+
+    def summarize(self) -> None:
+        # Summaries are produced as entries arrive
+        pass
+
+    def _compact(self) -> None:
+        # Oldest run of entries within the chunk budget (at least one),
+        # keeping the newest entries raw
+        limit = max(1, len(self._tokens) - self.threshold // 2)
+        n, total = 0, 0
+        for tokens in self._tokens:
+            if n == limit or (n and total + tokens > self.chunk_tokens):
+                break
+            total += tokens
+            n += 1
+        entries = self.inner.peek_oldest(n)
+        summary = None
+        if entries:
+            text = "\n".join(f"{role}: {content}" for role, content, _ in entries)
+            summary = self._complete(SUMMARIZE_PROMPT, text)
+            self.inner.pop_oldest(len(entries))
+        for _ in range(n):
+            self._tokens.popleft()
+        if summary is not None:
+            self._push(0, summary)
+
+    def _push(self, level: int, summary: str) -> None:
+        while len(self.levels) <= level:
+            self.levels.append([])
+        self.levels[level].append(summary)
+        if len(self.levels[level]) >= self.fanout:
+            merged = self._complete(MERGE_PROMPT, "\n".join(self.levels[level]))
+            self.levels[level] = []
+            self._push(level + 1, merged)
+
+    def _complete(self, instruction: str, text: str) -> str:
+        self.llm_calls += 1
+        return complete_summary(self.client, self.model, instruction, text, **self.summarizer_kwargs)
@@ -1,53 +1,1054 @@
-import openai
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
 import numpy as np
 import faiss
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, FrozenSet, Iterable, Iterator, NamedTuple, Optional, Sequence, Set
 from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.embedders import Embedder, OpenAIEmbedder
+from orchestrai.memory.embedding_cache import EmbeddingCache
+
+Entry = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+METRICS = ("l2", "ip", "cosine")
+SNAPSHOT_FORMAT = 2
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token) used to size embedding batches."""
+    return max(1, len(text) // 4)
+
+
+def iter_batches(
+    entries: Iterable[Entry], batch_size: int, max_tokens: int
+) -> Iterator[List[Entry]]:
+    """Group (key, value, metadata) entries into request-sized batches by entry and token count."""
+    batch: List[Entry] = []
+    tokens = 0
+    for entry in entries:
+        cost = _estimate_tokens(entry[1])
+        if batch and (len(batch) >= batch_size or tokens + cost > max_tokens):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(entry)
+        tokens += cost
+    if batch:
+        yield batch
+
+
+# Free text is never worth an inverted-index entry: one posting per entry
+UNINDEXED_FIELDS = frozenset({"content", "text"})
+MAX_INDEXED_STR_LEN = 64
+
+
+def _items(value: Any) -> Tuple[Any, ...]:
+    """A metadata value's items (list items count individually)."""
+    return tuple(value) if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+
+
+def _indexable(item: Any) -> bool:
+    if isinstance(item, str):
+        return len(item) <= MAX_INDEXED_STR_LEN
+    return item is None or isinstance(item, (int, float, bool))
+
+
+def _index_values(value: Any) -> Iterator[Any]:
+    """Metadata values that get an inverted-index entry."""
+    for item in _items(value):
+        if _indexable(item):
+            yield item
+
+
+def _merge_topk(
+    D1: np.ndarray, I1: np.ndarray, D2: np.ndarray, I2: np.ndarray, k: int,
+    largest: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge two (n, *) search results into the k best per row: smallest
+    distances, or largest similarities when `largest` is set.
+    """
+    D = np.hstack([D1, D2])
+    I = np.hstack([I1, I2])
+    order = np.argsort(-D if largest else D, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(D, order, axis=1), np.take_along_axis(I, order, axis=1)
+
+
+class _IndexView(NamedTuple):
+    """What a search sees: the base and tail indexes with their tombstones."""
+    index: faiss.Index
+    tail: Optional[faiss.Index]
+    dead: FrozenSet[int]
+    total: int
+
+
+class _IndexGuard:
+    """
+    Shared/exclusive access to the live FAISS indexes: searches share
+    them, while adding to an index waits until no search is running.
+    Waiting writers go first, so a stream of searches can't starve them.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._searches = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._searches += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._searches -= 1
+                if not self._searches:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._searches:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
 
 class VectorMemoryStore(MemoryStore):
     """
     Semantic memory: embeds each (key,value) and indexes in a FAISS index.
+
+    Texts are embedded by `embedder` (any `Embedder`); by default an
+    `OpenAIEmbedder` built from `embed_model`, `dim` and `client`. When an
+    embedder is given, its `model` and `dim` take precedence.
+
+    Entries are embedded in batches: `add_many` groups texts into requests
+    bounded by `batch_size` entries and `max_batch_tokens` tokens, and each
+    batch costs one embeddings call plus one `index.add`. With
+    `write_behind=True`, `add` only enqueues the entry and a background
+    worker coalesces pending entries into batches; call `flush()` to wait
+    for them (queries flush automatically).
+
+    Pass an `EmbeddingCache` to reuse embeddings for texts (and queries)
+    that were already embedded with the same `embed_model`.
+
+    `index_type` selects the FAISS index: "flat" (exact), "ivf_flat",
+    "ivf_pq" or "hnsw". IVF indexes need training, so the store serves
+    queries from a flat index until `train_size` vectors exist, then trains
+    and fills the new index on a background thread and swaps it in; queries
+    keep hitting the flat index meanwhile. `nprobe` / `ef_search` set the
+    default search breadth and can be overridden per query.
+
+    `save(path)` writes a snapshot directory and `VectorMemoryStore.load`
+    reopens it with the index memory-mapped, so worker processes share one
+    page-cached copy. Once a store is bound to a snapshot the base index is
+    frozen: new vectors go to a small in-memory tail index, and the next
+    `save` only appends the tail's new vectors and metadata.
+
+    Every vector carries a stable ID (`IndexIDMap2`). `upsert` and `delete`
+    tombstone the IDs of a key rather than touching the index; queries skip
+    tombstoned IDs and over-fetch to still return `top_k` live entries.
+    Once tombstones exceed `compact_threshold` of the stored vectors, the
+    index is rebuilt from the live vectors in the background.
+
+    Scalar metadata fields are kept in inverted indexes ((field, value) ->
+    set of live IDs), so `query(..., filter={"type": "docstring"})`
+    searches within a subset. Free text ("content"/"text" fields and
+    strings over MAX_INDEXED_STR_LEN characters) is not indexed; filters
+    on it scan the stored metadata instead. Selective filters (matching at most
+    `filter_selectivity` of the entries) restrict the FAISS search to the
+    matching IDs; broad ones over-fetch and post-filter instead.
+
+    FAISS searches run outside the store lock, so concurrent queries
+    overlap with each other and with metadata updates; only adding
+    vectors to an index waits for the searches using it.
+
+    `metric` is "l2" (squared Euclidean distance), "ip" (inner product) or
+    "cosine" (inner product over L2-normalized vectors). `query_with_scores`
+    also returns a similarity score per hit (higher is better: the inner
+    product, or 1 / (1 + distance) for L2) and drops hits below `min_score`.
     """
 
     def __init__(
         self,
         embed_model: str = "text-embedding-ada-002",
         dim: int = 1536,
+        client: Any = None,
+        batch_size: int = 128,
+        max_batch_tokens: int = 8000,
+        write_behind: bool = False,
+        cache: Optional[EmbeddingCache] = None,
+        index_type: str = "flat",
+        nlist: int = 100,
+        pq_m: int = 16,
+        hnsw_m: int = 32,
+        train_size: Optional[int] = None,
+        nprobe: int = 8,
+        ef_search: int = 64,
+        compact_threshold: float = 0.2,
+        filter_selectivity: float = 0.1,
+        metric: str = "l2",
+        embedder: Optional[Embedder] = None,
     ):
-        self.embed_model = embed_model
-        # FAISS index for L2 similarity on float32 vectors
-        self.index = faiss.IndexFlatL2(dim)
-        self.metadatas: List[Tuple[str, Dict[str, Any]]] = []
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+        self.embedder = embedder or OpenAIEmbedder(embed_model, dim, client)
+        self.embed_model = self.embedder.model
+        self.dim = self.embedder.dim
+        self.metric = metric
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.write_behind = write_behind
+        self.cache = cache
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.hnsw_m = hnsw_m
+        if train_size is None:
+            # FAISS wants ~39 training points per centroid (256 per PQ sub-quantizer)
+            train_size = 39 * (max(nlist, 256) if index_type == "ivf_pq" else nlist)
+        self.train_size = train_size
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.compact_threshold = compact_threshold
+        self.filter_selectivity = filter_selectivity
+        # FAISS index over float32 vectors; trained index types start flat and are migrated once `train_size` is reached
+        self.index = self._wrap(self._new_flat() if self._needs_training() else self._new_index())
+        # live entries by vector ID; tombstoned IDs stay in the index until compaction
+        self.metadatas: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        # raw values of live entries whose metadata carries no text field
+        self._values: Dict[int, str] = {}
+        self._key_ids: Dict[str, List[int]] = {}
+        # (metadata field, value) -> set of live IDs
+        self._postings: Dict[Tuple[str, Any], Set[int]] = {}
+        self._dead: Set[int] = set()
+        self._next_id = 0
+
+        self._lock = threading.Lock()
+        # Taken inside `_lock` by writers; searches take it without `_lock`
+        self._index_guard = _IndexGuard()
+        self._pending: "queue.Queue[Optional[Entry]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_error: Optional[BaseException] = None
+        self._rebuilding: Optional[threading.Thread] = None
+        # A failed training run: reported once by `wait_for_index`, and
+        # automatic builds stay off until `build_index` is called again
+        self._build_error: Optional[BaseException] = None
+        self._build_failed = False
+
+        # Snapshot state: the frozen base index, the tail written after it,
+        # how much of the tail is on disk and the metadata ops not yet saved.
+        self._tail: Optional[faiss.Index] = None
+        self._readonly = False
+        self._snapshot_path: Optional[str] = None
+        self._snapshot_gen = 0
+        self._snapshot_base: Optional[faiss.Index] = None
+        self._tail_saved = 0
+        self._meta_name = ""
+        self._meta_bytes = 0
+        self._journal: List[list] = []
 
     def add(self, key: str, value: str, metadata: Dict[str, Any] = None) -> None:
-        # 1) Embed the text
-        resp = openai.embeddings.create(
-            model=self.embed_model,
-            input=value
-        )
-        vec = np.array(resp.data[0].embedding, dtype="float32").reshape(1, -1)
+        if self.write_behind:
+            self._ensure_worker()
+            self._pending.put((key, value, metadata))
+        else:
+            self.add_many([(key, value, metadata)])
+
+    def add_many(self, entries: Iterable[Entry]) -> None:
+        """
+        Embed and index many (key, value, metadata) entries, one
+        embeddings request and one `index.add` per batch.
+        """
+        for batch in self._iter_batches(entries):
+            self._add_batch(batch)
+
+    def upsert(self, key: str, value: str, metadata: Dict[str, Any] = None) -> None:
+        """Replace every entry stored under `key` with this one."""
+        self.upsert_many([(key, value, metadata)])
+
+    def upsert_many(self, entries: Iterable[Entry]) -> None:
+        """Batched `upsert`; if a key repeats, its last entry wins."""
+        self.flush()
+        latest = {entry[0]: entry for entry in entries}
+        for batch in self._iter_batches(latest.values()):
+            self._add_batch(batch, replace=True)
+
+    def delete(self, key: str) -> int:
+        """
+        Tombstone every entry stored under `key`; returns how many were
+        removed. May start a background compaction.
+        """
+        self.flush()
+        with self._lock:
+            removed = self._tombstone(key)
+            compact = self._should_compact()
+        if compact:
+            self.compact(background=True)
+        return removed
+
+    def pop_oldest(self, n: int) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Tombstone the `n` earliest-added live entries and return them as
+        (key, content, metadata); content is the "content" (or "text")
+        metadata field, or the value as added when metadata has neither.
+        """
+        self.flush()
+        with self._lock:
+            # IDs grow with insertion order, and so does `metadatas`
+            ids = list(islice(self.metadatas, max(n, 0)))
+            for idx in ids:
+                key_ids = self._key_ids[self.metadatas[idx][0]]
+                key_ids.remove(idx)
+                if not key_ids:
+                    del self._key_ids[self.metadatas[idx][0]]
+            removed = self._tombstone_ids(ids)
+            compact = self._should_compact()
+        if compact:
+            self.compact(background=True)
+        return removed
+
+    def peek_oldest(self, n: int) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        The `n` earliest-added live entries as `pop_oldest` returns them,
+        left in place.
+        """
+        self.flush()
+        with self._lock:
+            return [self._entry(idx) for idx in islice(self.metadatas, max(n, 0))]
 
-        # 2) Add vector to FAISS and store metadata
-        self.index.add(vec)
-        self.metadatas.append((key, metadata or {"content": value}))
+    def flush(self) -> None:
+        """
+        Block until every entry queued by write-behind `add` is indexed.
+        Re-raises the first error the background worker hit.
+        """
+        if self._worker is not None:
+            self._pending.join()
+        if self._worker_error is not None:
+            err, self._worker_error = self._worker_error, None
+            raise err
+
+    def close(self) -> None:
+        """Flush pending writes and stop the write-behind worker."""
+        if self._worker is not None:
+            self.flush()
+            self._pending.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def query(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Return the `top_k` nearest (key, metadata) entries. `filter` maps
+        metadata fields to a value or a list of accepted values; all
+        fields must match.
+        """
+        return [
+            (key, meta)
+            for key, meta, _ in self.query_with_scores(query, top_k, filter, nprobe=nprobe, ef_search=ef_search)
+        ]
+
+    def query_with_scores(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[str, Dict[str, Any], float]]:
+        """
+        Like `query`, but returns (key, metadata, score) triples, best
+        first, omitting hits whose score is below `min_score`.
+        """
+        self.flush()
 
-    def query(self, query: str, top_k: int = 5) -> List[Tuple[str, Dict[str, Any]]]:
         # 1) Embed the query
-        resp = openai.embeddings.create(
-            model=self.embed_model,
-            input=query
-        )
-        qvec = np.array(resp.data[0].embedding, dtype="float32").reshape(1, -1)
+        qvec = self._prepare(self._embed([query]))
 
-        # 2) Search FAISS
-        distances, indices = self.index.search(qvec, top_k)
-        results = []
-        for idx in indices[0]:
-            if idx >= 0 and idx < len(self.metadatas):
-                key, meta = self.metadatas[idx]
-                results.append((key, meta))
-        return results
+        # 2) Search FAISS, over-fetching past tombstoned or filtered-out IDs
+        return self._query_vectors(qvec, top_k, filter, min_score, nprobe, ef_search)[0]
+
+    def query_many(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        `query` for several texts at once: one embedding request and one
+        batched index search for the whole list. Returns one result list
+        per query, in order.
+        """
+        return [
+            [(key, meta) for key, meta, _ in hits]
+            for hits in self.query_many_with_scores(queries, top_k, filter, nprobe=nprobe, ef_search=ef_search)
+        ]
+
+    def query_many_with_scores(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """Scored variant of `query_many` (see `query_with_scores`)."""
+        if not queries:
+            return []
+        self.flush()
+        qvecs = self._prepare(self._embed(list(queries)))
+        return self._query_vectors(qvecs, top_k, filter, min_score, nprobe, ef_search)
 
     def summarize(self) -> None:
         # No-op for this store
         pass
+
+    def __len__(self) -> int:
+        return len(self.metadatas)
+
+    @property
+    def tombstones(self) -> int:
+        """Number of deleted vectors still occupying the index."""
+        return len(self._dead)
+
+    def save(self, path: str, compact: Optional[bool] = None, max_tail_ratio: float = 0.25) -> None:
+        """
+        Persist the index and metadata under directory `path`.
+
+        Saving again to the snapshot the store is bound to only appends the
+        vectors and metadata changes made since the last save. The tail is
+        merged into a rewritten base index when `compact=True`, or
+        automatically once it exceeds `max_tail_ratio` of the base.
+        Metadata must be JSON-serializable.
+        """
+        self.flush()
+        self.wait_for_index()
+        path = os.path.abspath(path)
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            bound = path == self._snapshot_path and self.index is self._snapshot_base
+            if compact is None and bound and self._tail is not None:
+                compact = self._tail.ntotal > max_tail_ratio * max(self.index.ntotal, 1)
+            if bound and not compact:
+                self._append_snapshot()
+            else:
+                self._write_snapshot(path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, **kwargs: Any) -> "VectorMemoryStore":
+        """
+        Open a snapshot written by `save`. With `mmap=True` the base index
+        is memory-mapped read-only; the store can still be written to, new
+        entries go to the in-memory tail until the next compacting save.
+        `kwargs` are passed to the constructor (client, embedder, cache,
+        ...); the embedder must produce the same embedding space.
+        """
+        path = os.path.abspath(path)
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format in {path}: {manifest.get('format')!r}")
+        kwargs.setdefault("embed_model", manifest["embed_model"])
+        kwargs.setdefault("index_type", manifest["index_type"])
+        kwargs.setdefault("metric", manifest.get("metric", "l2"))
+        store = cls(dim=manifest["dim"], **kwargs)
+        if (store.embed_model, store.dim) != (manifest["embed_model"], manifest["dim"]):
+            raise ValueError(
+                f"Snapshot {path} holds {manifest['embed_model']!r} vectors of dim "
+                f"{manifest['dim']}, not {store.embed_model!r} of dim {store.dim}"
+            )
+
+        gen, n_tail = manifest["generation"], manifest["tail"]
+        flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if mmap else 0
+        store.index = faiss.read_index(os.path.join(path, f"index-{gen}.faiss"), flags)
+        store._readonly = mmap
+
+        store._tail = store._wrap(store._new_flat())
+        vecs = np.fromfile(
+            os.path.join(path, f"tail-{gen}.f32"), dtype="float32", count=n_tail * store.dim
+        )
+        ids = np.fromfile(os.path.join(path, f"tail-{gen}.ids"), dtype="int64", count=n_tail)
+        if n_tail:
+            store._tail.add_with_ids(vecs.reshape(-1, store.dim), ids)
+
+        # replay the metadata log: [id, key, meta] adds ([id, key, meta,
+        # value] when the value isn't in meta), [id] deletes; manifests
+        # written before the log was per-generation don't name it
+        meta_name = manifest.get("metadata", "metadata.jsonl")
+        with open(os.path.join(path, meta_name), "rb") as f:
+            lines = f.read(manifest["metadata_bytes"]).splitlines()
+        for line in lines:
+            op = json.loads(line)
+            if len(op) >= 3:
+                store.metadatas[op[0]] = (op[1], op[2])
+                if len(op) == 4:
+                    store._values[op[0]] = op[3]
+            else:
+                store.metadatas.pop(op[0], None)
+                store._values.pop(op[0], None)
+        for idx, (key, meta) in store.metadatas.items():
+            store._key_ids.setdefault(key, []).append(idx)
+            store._index_metadata(idx, meta)
+        stored = np.concatenate([faiss.vector_to_array(store.index.id_map), ids])
+        store._dead = set(stored.tolist()) - store.metadatas.keys()
+        store._next_id = manifest["next_id"]
+
+        store._snapshot_path = path
+        store._snapshot_gen = gen
+        store._snapshot_base = store.index
+        store._tail_saved = n_tail
+        store._meta_name = meta_name
+        store._meta_bytes = manifest["metadata_bytes"]
+        return store
+
+    @property
+    def is_trained(self) -> bool:
+        """True once the configured index type is the one serving queries."""
+        # Keep the wrapper referenced: `.index` is a borrowed pointer that a
+        # concurrent rebuild swapping `self.index` would otherwise free
+        index = self.index
+        return not self._needs_training() or not isinstance(
+            faiss.downcast_index(index.index), faiss.IndexFlat
+        )
+
+    def build_index(self, background: bool = False) -> None:
+        """
+        Train the configured index on the vectors stored so far and swap it
+        in. Runs automatically (in the background) once `train_size`
+        vectors exist; call it directly to train earlier, or to retry after
+        a failed build.
+        """
+        if not self.is_trained:
+            self._build_failed = False
+            self._start_rebuild(background, min_train=self._min_train())
+
+    def compact(self, background: bool = False) -> None:
+        """Rebuild the index from live vectors only, dropping tombstones."""
+        self._start_rebuild(background, min_train=self._min_train() if self.is_trained else self.train_size)
+
+    def wait_for_index(self) -> None:
+        """
+        Block until an in-flight background rebuild (training or compaction)
+        finishes, re-raising the error if training failed.
+        """
+        if self._rebuilding is not None:
+            self._rebuilding.join()
+        error, self._build_error = self._build_error, None
+        if error is not None:
+            raise error
+
+    def _min_train(self) -> int:
+        """Fewest vectors training can run on: one per centroid, 2**8 per PQ sub-quantizer."""
+        return max(self.nlist, 2 ** 8) if self.index_type == "ivf_pq" else self.nlist
+
+    def _needs_training(self) -> bool:
+        return self.index_type in ("ivf_flat", "ivf_pq")
+
+    def _new_index(self) -> faiss.Index:
+        """Build an empty index of the configured type."""
+        metric = self._faiss_metric()
+        if self.index_type == "hnsw":
+            return faiss.IndexHNSWFlat(self.dim, self.hnsw_m, metric)
+        if self.index_type == "ivf_flat":
+            return faiss.IndexIVFFlat(self._new_flat(), self.dim, self.nlist, metric)
+        if self.index_type == "ivf_pq":
+            return faiss.IndexIVFPQ(self._new_flat(), self.dim, self.nlist, self.pq_m, 8, metric)
+        return self._new_flat()
+
+    def _new_flat(self) -> faiss.Index:
+        return faiss.IndexFlat(self.dim, self._faiss_metric())
+
+    def _faiss_metric(self) -> int:
+        return faiss.METRIC_L2 if self.metric == "l2" else faiss.METRIC_INNER_PRODUCT
+
+    def _prepare(self, vecs: np.ndarray) -> np.ndarray:
+        """Normalize vectors in place for cosine similarity."""
+        if self.metric == "cosine":
+            faiss.normalize_L2(vecs)
+        return vecs
+
+    def _score(self, dist: float) -> float:
+        """Similarity score, higher is better, from a raw FAISS distance."""
+        if self.metric == "l2":
+            return 1.0 / (1.0 + float(dist))
+        return float(dist)
+
+    @staticmethod
+    def _wrap(index: faiss.Index) -> faiss.Index:
+        return faiss.IndexIDMap2(index)
+
+    def _ntotal(self) -> int:
+        return self.index.ntotal + (self._tail.ntotal if self._tail is not None else 0)
+
+    def _should_compact(self) -> bool:
+        return bool(self._dead) and len(self._dead) > self.compact_threshold * self._ntotal()
+
+    def _tombstone(self, key: str) -> int:
+        ids = self._key_ids.pop(key, [])
+        self._tombstone_ids(ids)
+        return len(ids)
+
+    def _entry(self, idx: int) -> Tuple[str, str, Dict[str, Any]]:
+        """(key, content, metadata) of a live entry."""
+        key, meta = self.metadatas[idx]
+        content = meta.get("content", meta.get("text", self._values.get(idx, "")))
+        return key, content, meta
+
+    def _tombstone_ids(self, ids: List[int]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        removed = []
+        for idx in ids:
+            removed.append(self._entry(idx))
+            _, meta = self.metadatas.pop(idx)
+            self._values.pop(idx, None)
+            self._index_metadata(idx, meta, remove=True)
+            self._dead.add(idx)
+            if self._snapshot_path is not None:
+                self._journal.append([idx])
+        return removed
+
+    def _index_metadata(self, idx: int, meta: Dict[str, Any], remove: bool = False) -> None:
+        for field, value in meta.items():
+            if field in UNINDEXED_FIELDS:
+                continue
+            for item in _index_values(value):
+                posting = (field, item)
+                if remove:
+                    ids = self._postings.get(posting)
+                    if ids is not None:
+                        ids.discard(idx)
+                        if not ids:
+                            del self._postings[posting]
+                else:
+                    self._postings.setdefault(posting, set()).add(idx)
+
+    def _filter_ids(self, filter: Dict[str, Any]) -> Set[int]:
+        """Live IDs matching every field of `filter`."""
+        with self._lock:
+            indexed, scanned = [], []
+            for field, accepted in filter.items():
+                items = _items(accepted)
+                if field in UNINDEXED_FIELDS or not all(_indexable(item) for item in items):
+                    scanned.append((field, set(items)))
+                    continue
+                ids: Set[int] = set()
+                for item in items:
+                    ids |= self._postings.get((field, item), set())
+                indexed.append(ids)
+            if indexed:
+                indexed.sort(key=len)
+                result = indexed[0].intersection(*indexed[1:])
+            else:
+                result = set(self.metadatas)
+            for field, accepted in scanned:
+                result = {
+                    idx for idx in result
+                    if field in self.metadatas[idx][1]
+                    and not accepted.isdisjoint(_items(self.metadatas[idx][1][field]))
+                }
+            return result
+
+    def _stored_vectors(
+        self, exclude: Set[int] = frozenset(), min_id: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, vectors) held by the base and tail indexes, filtered by ID."""
+        id_parts, vec_parts = [], []
+        for index in (self.index, self._tail):
+            if index is None or not index.ntotal:
+                continue
+            ids = faiss.vector_to_array(index.id_map)
+            mask = ids >= min_id
+            if exclude:
+                mask &= ~np.isin(ids, np.fromiter(exclude, dtype="int64"))
+            positions = np.flatnonzero(mask)
+            if not len(positions):
+                continue
+            start = int(positions[0])
+            inner = faiss.downcast_index(index.index)
+            vecs = inner.reconstruct_n(start, index.ntotal - start)
+            id_parts.append(ids[positions])
+            vec_parts.append(vecs[positions - start])
+        if not id_parts:
+            return np.empty(0, dtype="int64"), np.empty((0, self.dim), dtype="float32")
+        return np.concatenate(id_parts), np.vstack(vec_parts)
+
+    def _start_rebuild(self, background: bool, min_train: int) -> None:
+        with self._lock:
+            if self._rebuilding is not None and self._rebuilding.is_alive():
+                return
+            if background:
+                # Not a daemon: a build cut off at interpreter exit can crash
+                # inside FAISS, so shutdown waits for it instead
+                self._rebuilding = threading.Thread(
+                    target=self._rebuild, args=(min_train,), name="vector-memory-index"
+                )
+                self._rebuilding.start()
+                return
+        self._rebuild(min_train)
+
+    def _rebuild(self, min_train: int) -> None:
+        """
+        Build a fresh index from the live vectors without holding the lock
+        while building, then catch up with concurrent writes and swap it
+        in. Trained index types fall back to flat below `min_train` vectors.
+
+        Once trained, the coarse quantizer and PQ codebooks are reused: the
+        stored vectors are decoded from their codes, and retraining on those
+        would lose accuracy with every compaction. Training only ever sees
+        the raw vectors held by the flat index.
+        """
+        with self._lock:
+            watermark = self._next_id
+            dropped = set(self._dead)
+            ids, vecs = self._stored_vectors(exclude=dropped)
+            inner = None
+            if self._needs_training() and self.is_trained:
+                inner = faiss.clone_index(faiss.downcast_index(self.index.index))
+                inner.reset()
+
+        if inner is None:
+            inner = self._new_index()
+        if not inner.is_trained:
+            if len(ids) >= max(min_train, self._min_train()):
+                try:
+                    inner.train(vecs)
+                except Exception as exc:
+                    self._build_failed = True
+                    if threading.current_thread() is not self._rebuilding:
+                        raise
+                    self._build_error = exc
+                    return
+            else:
+                inner = self._new_flat()
+        new = self._wrap(inner)
+        new.add_with_ids(vecs, ids)
+
+        with self._lock:
+            # catch up with vectors added while we were building
+            ids, vecs = self._stored_vectors(min_id=watermark)
+            if len(ids):
+                new.add_with_ids(vecs, ids)
+            self.index = new
+            self._tail = None
+            self._readonly = False
+            self._dead -= dropped
+
+    def _write_snapshot(self, path: str) -> None:
+        """Full snapshot: merge the tail into a new base index file."""
+        index = self.index
+        if self._tail is not None and self._tail.ntotal:
+            if self._readonly:
+                # a memory-mapped index cannot grow; copy it into owned memory
+                index = faiss.deserialize_index(faiss.serialize_index(index))
+            with self._index_guard.exclusive():
+                index.add_with_ids(
+                    faiss.downcast_index(self._tail.index).reconstruct_n(0, self._tail.ntotal),
+                    faiss.vector_to_array(self._tail.id_map),
+                )
+
+        old_gen = self._snapshot_gen if path == self._snapshot_path else None
+        old_meta = self._meta_name
+        gen = self._snapshot_gen + 1
+        faiss.write_index(index, os.path.join(path, f"index-{gen}.faiss"))
+        for ext in ("f32", "ids"):
+            open(os.path.join(path, f"tail-{gen}.{ext}"), "wb").close()
+
+        # a new file per generation, so the manifest swap is the only commit point
+        meta_name = f"metadata-{gen}.jsonl"
+        meta_file = os.path.join(path, meta_name)
+        with open(meta_file, "wb") as f:
+            f.write(self._encode_ops(self._add_op(idx) for idx in self.metadatas))
+
+        if index is not self.index:
+            self.index = index
+            self._readonly = False
+        self._tail = self._wrap(self._new_flat())
+        self._snapshot_path = path
+        self._snapshot_gen = gen
+        self._snapshot_base = index
+        self._tail_saved = 0
+        self._meta_name = meta_name
+        self._meta_bytes = os.path.getsize(meta_file)
+        self._journal = []
+        self._write_manifest()
+
+        if old_gen is not None:
+            for name in (f"index-{old_gen}.faiss", f"tail-{old_gen}.f32", f"tail-{old_gen}.ids", old_meta):
+                try:
+                    os.remove(os.path.join(path, name))
+                except FileNotFoundError:
+                    pass
+
+    def _append_snapshot(self) -> None:
+        """Incremental snapshot: append new tail vectors and the metadata log."""
+        path, gen = self._snapshot_path, self._snapshot_gen
+        start, new = self._tail_saved, self._tail.ntotal - self._tail_saved
+        vecs = faiss.downcast_index(self._tail.index).reconstruct_n(start, new) if new else None
+        ids = faiss.vector_to_array(self._tail.id_map)[start:]
+        for ext, item_size, data in (("f32", self.dim * 4, vecs), ("ids", 8, ids)):
+            with open(os.path.join(path, f"tail-{gen}.{ext}"), "r+b") as f:
+                # drop anything a crashed save wrote past the manifest
+                f.truncate(start * item_size)
+                f.seek(0, os.SEEK_END)
+                if new:
+                    f.write(data.tobytes())
+
+        with open(os.path.join(path, self._meta_name), "r+b") as f:
+            f.truncate(self._meta_bytes)
+            f.seek(0, os.SEEK_END)
+            f.write(self._encode_ops(self._journal))
+            self._meta_bytes = f.tell()
+        self._journal = []
+        self._tail_saved = self._tail.ntotal
+        self._write_manifest()
+
+    def _add_op(self, idx: int) -> list:
+        key, meta = self.metadatas[idx]
+        return [idx, key, meta] if idx not in self._values else [idx, key, meta, self._values[idx]]
+
+    @staticmethod
+    def _encode_ops(ops: Iterable[list]) -> bytes:
+        return b"".join(
+            json.dumps(op, ensure_ascii=False).encode("utf-8") + b"\n" for op in ops
+        )
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "embed_model": self.embed_model,
+            "dim": self.dim,
+            "index_type": self.index_type,
+            "metric": self.metric,
+            "generation": self._snapshot_gen,
+            "tail": self._tail_saved,
+            "next_id": self._next_id,
+            "metadata": self._meta_name,
+            "metadata_bytes": self._meta_bytes,
+        }
+        manifest_file = os.path.join(self._snapshot_path, "manifest.json")
+        with open(manifest_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(manifest_file + ".tmp", manifest_file)
+
+    def _view(self) -> "_IndexView":
+        """
+        The indexes, their tombstones and vector count as of one moment.
+        Searches run outside the lock against this view; a rebuild swapping
+        in new indexes (and clearing their tombstones) leaves it intact.
+        """
+        with self._lock:
+            return _IndexView(self.index, self._tail, frozenset(self._dead), self._ntotal())
+
+    def _search(
+        self,
+        view: "_IndexView",
+        qvecs: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        sel: Optional[faiss.IDSelector] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        index, tail = view.index, view.tail
+        inner = faiss.downcast_index(index.index)
+        if isinstance(inner, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(nprobe=nprobe or self.nprobe, sel=sel)
+        elif isinstance(inner, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(efSearch=ef_search or self.ef_search, sel=sel)
+        elif sel is not None:
+            params = faiss.SearchParameters(sel=sel)
+        else:
+            params = None
+        with self._index_guard.shared():
+            D, I = index.search(qvecs, k, params=params)
+            if tail is not None and tail.ntotal:
+                tail_params = faiss.SearchParameters(sel=sel) if sel is not None else None
+                tD, tI = tail.search(qvecs, k, params=tail_params)
+                D, I = _merge_topk(D, I, tD, tI, k, largest=self.metric != "l2")
+        return D, I
+
+    def _search_live(
+        self,
+        qvecs: np.ndarray,
+        top_k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Per query row, (ID, distance) of the `top_k` nearest live vectors
+        that match `filter`. All rows are searched in one batched call;
+        only rows left short by tombstones or the filter are searched
+        again with a wider window.
+        """
+        n = len(qvecs)
+        view = self._view()
+        total = view.total
+        if not total or top_k <= 0:
+            return [[] for _ in range(n)]
+
+        allowed = None
+        if filter:
+            allowed = self._filter_ids(filter)
+            matches = len(allowed)
+            if not matches:
+                return [[] for _ in range(n)]
+            if matches <= self.filter_selectivity * len(self):
+                # selective: only the matching (live) IDs are visited
+                sel = faiss.IDSelectorBatch(np.fromiter(allowed, dtype="int64", count=matches))
+                D, I = self._search(view, qvecs, min(top_k, matches), nprobe, ef_search, sel=sel)
+                return [[(int(i), d) for i, d in zip(I[r], D[r]) if i >= 0] for r in range(n)]
+            live = matches
+        else:
+            live = max(total - len(view.dead), 1)
+
+        results: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        rows = np.arange(n)
+        fetch = top_k if live >= total else min(total, top_k * total // live + 1)
+        while len(rows):
+            D, I = self._search(view, qvecs[rows], fetch, nprobe, ef_search)
+            short = []
+            for r, ids, dists in zip(rows, I, D):
+                if allowed is not None:
+                    hits = [(int(i), d) for i, d in zip(ids, dists) if i >= 0 and int(i) in allowed]
+                else:
+                    hits = [(int(i), d) for i, d in zip(ids, dists) if i >= 0 and i not in view.dead]
+                results[r] = hits[:top_k]
+                if len(hits) < top_k and fetch < total:
+                    short.append(r)
+            rows = np.array(short, dtype=np.int64)
+            fetch = min(total, fetch * 2)
+        return results
+
+    def _query_vectors(
+        self,
+        qvecs: np.ndarray,
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """Scored hits for each row of already embedded and prepared query vectors."""
+        results = []
+        for hits in self._search_live(qvecs, top_k, nprobe, ef_search, filter):
+            row = []
+            for idx, dist in hits:
+                entry = self.metadatas.get(idx)
+                score = self._score(dist)
+                if entry is not None and (min_score is None or score >= min_score):
+                    row.append((entry[0], entry[1], score))
+            results.append(row)
+        return results
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed `texts`, returning a (len(texts), dim) float32 matrix. Cached
+        vectors are reused; the remaining distinct texts cost one request.
+        """
+        if self.cache is None:
+            return self.embedder.embed(texts)
+        return self.cache.embed(self.embedder, texts)
+
+    def _iter_batches(self, entries: Iterable[Entry]) -> Iterator[List[Entry]]:
+        return iter_batches(entries, self.batch_size, self.max_batch_tokens)
+
+    def _add_batch(self, batch: List[Entry], replace: bool = False) -> None:
+        # 1) Embed the whole batch in one call
+        vecs = self._prepare(self._embed([value for _, value, _ in batch]))
+
+        # 2) Add the stacked vectors to FAISS and store metadata
+        self._add_vectors(batch, vecs, replace)
+
+    def _add_vectors(self, batch: List[Entry], vecs: np.ndarray, replace: bool = False) -> None:
+        """Index prepared vectors for `batch` under fresh IDs."""
+        with self._lock:
+            if replace:
+                for key, _, _ in batch:
+                    self._tombstone(key)
+            ids = np.arange(self._next_id, self._next_id + len(batch), dtype="int64")
+            self._next_id += len(batch)
+            with self._index_guard.exclusive():
+                (self._tail if self._tail is not None else self.index).add_with_ids(vecs, ids)
+            for idx, (key, value, metadata) in zip(ids.tolist(), batch):
+                meta = metadata or {"content": value}
+                self.metadatas[idx] = (key, meta)
+                if "content" not in meta and "text" not in meta:
+                    # kept so pop_oldest/peek_oldest can hand the text back
+                    self._values[idx] = value
+                self._key_ids.setdefault(key, []).append(idx)
+                self._index_metadata(idx, meta)
+                if self._snapshot_path is not None:
+                    self._journal.append(self._add_op(idx))
+            ready = (
+                not self.is_trained
+                and not self._build_failed
+                and len(self.metadatas) >= max(self.train_size, self._min_train())
+            )
+            compact = replace and self._should_compact()
+        if ready:
+            self.build_index(background=True)
+        elif compact:
+            self.compact(background=True)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._drain, name="vector-memory-writer", daemon=True
+            )
+            self._worker.start()
+
+    def _drain(self) -> None:
+        """Write-behind loop: coalesce whatever is queued into batches."""
+        while True:
+            first = self._pending.get()
+            if first is None:
+                self._pending.task_done()
+                return
+            entries = [first]
+            stop = False
+            while len(entries) < self.batch_size:
+                try:
+                    entry = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                entries.append(entry)
+            try:
+                self.add_many(entries)
+            except BaseException as err:  # surfaced by flush()
+                if self._worker_error is None:
+                    self._worker_error = err
+            finally:
+                for _ in range(len(entries) + stop):
+                    self._pending.task_done()
+            if stop:
+                return
@@ -0,0 +1,60 @@
+# src/orchestrai/memory/tokenizers.py
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+
+class Tokenizer(ABC):
+    """Counts the tokens a text will cost in a model's context window."""
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        ...
+
+
+class CharEstimateTokenizer(Tokenizer):
+    """
+    Dependency-free estimate of ~`chars_per_token` characters per token
+    (about 4 for English with OpenAI tokenizers); never less than 1.
+    """
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return max(1, int(len(text) / self.chars_per_token))
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact OpenAI token counts via the optional `tiktoken` package."""
+
+    def __init__(self, model: str = "gpt-4o-mini"):
+        try:
+            import tiktoken
+        except ImportError as e:
+            raise ImportError("TiktokenTokenizer requires the 'tiktoken' package") from e
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("o200k_base")
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+class CachedTokenizer(Tokenizer):
+    """
+    Memoizes another tokenizer for the `maxsize` most recently counted
+    texts; memory entries come back turn after turn and needn't be
+    re-tokenized each time.
+    """
+
+    def __init__(self, tokenizer: Tokenizer, maxsize: int = 4096):
+        self.tokenizer = tokenizer
+        self._count = lru_cache(maxsize=maxsize)(tokenizer.count)
+
+    def count(self, text: str) -> int:
+        return self._count(text)
+
+    def cache_info(self):
+        return self._count.cache_info()
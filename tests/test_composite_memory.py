@@ -0,0 +1,93 @@
+import time
+
+from orchestrai.memory.core import MemoryStore
+from orchestrai.memory.fusion import WeightedScoreFusion
+from orchestrai.memory.stores.composite_memory import CompositeMemoryStore
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+from orchestrai.memory.stores.rolling_buffer import RollingBufferStore
+
+
+class ListSemanticStore(MemoryStore):
+    """Returns fixed (key, metadata) hits, optionally after a delay or with an error."""
+
+    def __init__(self, hits, delay=0.0, error=None):
+        self.hits = hits
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def add(self, key, value, metadata=None):
+        pass
+
+    def query(self, query, top_k=5):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.hits[:top_k]
+
+    def summarize(self):
+        pass
+
+
+def make_recency(*keys):
+    recency = RollingBufferStore(max_size=10)
+    for key in keys:
+        recency.add(key, f"{key} text", {"text": f"{key} text"})
+    return recency
+
+
+def test_rrf_ranks_keys_found_by_both_sources_first():
+    semantic = ListSemanticStore([("a", {"text": "a text"}), ("b", {"text": "b text"})])
+    store = CompositeMemoryStore(make_recency("c", "b"), semantic)
+
+    keys = [key for key, _, _ in store.query("q", top_k=3)]
+    # "b" is in both lists; then the best hit of each source
+    assert keys == ["b", "a", "c"]
+    assert store.query("q", top_k=3, use_recency=False)[0] == ("a", "a text", {"text": "a text"})
+    store.close()
+
+
+def test_weighted_fusion_decays_older_entries():
+    semantic = ListSemanticStore([("a", {"text": "a text"})])
+    fusion = WeightedScoreFusion(weights={"semantic": 1.0, "recency": 0.5}, decay=0.5)
+    store = CompositeMemoryStore(make_recency("old", "mid", "new"), semantic, fusion=fusion)
+
+    keys = [key for key, _, _ in store.query("q", top_k=4)]
+    assert keys == ["a", "new", "mid", "old"]
+    store.close()
+
+
+def test_slow_or_failing_backend_returns_partial_results():
+    slow = ListSemanticStore([("a", {"text": "a text"})], delay=0.5)
+    store = CompositeMemoryStore(make_recency("c"), slow, timeout=0.05)
+
+    start = time.perf_counter()
+    assert [key for key, _, _ in store.query("q")] == ["c"]
+    assert time.perf_counter() - start < 0.4
+    assert isinstance(store.last_errors["semantic"], TimeoutError)
+
+    store.semantic = ListSemanticStore([], error=RuntimeError("backend down"))
+    assert [key for key, _, _ in store.query("q", timeout=1.0)] == ["c"]
+    assert isinstance(store.last_errors["semantic"], RuntimeError)
+    store.close()
+
+
+def test_kv_tier_answers_exact_keys_without_other_stores():
+    semantic = ListSemanticStore([("a", {"text": "a text"})])
+    store = CompositeMemoryStore(make_recency("c"), semantic, kv_store=KeyValueStore(":memory:"))
+    store.kv_set("user.name", "Ada")
+    store.kv_set("user.city", "London")
+
+    assert store.kv_get("user.name") == "Ada"
+    assert store.kv_get("user.age", default=0) == 0
+    assert store.kv_prefix("user.") == [("user.city", "London"), ("user.name", "Ada")]
+
+    assert store.query("user.name") == [("user.name", "Ada", {"source": "kv", "value": "Ada"})]
+    assert semantic.calls == 0
+
+    # prefix matches are fused with the other sources
+    keys = [key for key, _, _ in store.query("user.", top_k=4)]
+    assert semantic.calls == 1
+    assert keys == ["user.city", "a", "c", "user.name"]
+    store.close()
@@ -0,0 +1,39 @@
+# tests/test_embedders.py
+
+import numpy as np
+from orchestrai.memory.embedders import HashingEmbedder, OpenAIEmbedder
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+from tests.test_vector_memory import FakeEmbeddingClient
+
+
+def test_hashing_embedder_is_deterministic_and_batch_consistent():
+    texts = ["How do I initialize the database?", "initialize the database", "fun facts about trees", ""]
+    a = HashingEmbedder(dim=64)
+    b = HashingEmbedder(dim=64)
+
+    batch = a.embed(texts)
+    assert batch.shape == (4, 64) and batch.dtype == np.float32
+    assert np.allclose(batch, b.embed(texts))
+    assert np.allclose(batch[1], a.embed([texts[1]])[0], atol=1e-6)
+    assert np.allclose(np.linalg.norm(batch[:3], axis=1), 1.0, atol=1e-5)
+    # texts sharing n-grams are closer than unrelated ones
+    assert batch[0] @ batch[1] > batch[0] @ batch[2]
+    assert a.model != HashingEmbedder(dim=64, seed=1).model
+
+
+def test_store_runs_offline_with_local_embedder():
+    store = VectorMemoryStore(embedder=HashingEmbedder(dim=64), metric="cosine")
+    assert store.embed_model.startswith("hashing-") and store.dim == 64
+
+    store.add_many([
+        ("db", "How to initialize the database connection", None),
+        ("style", "Maximum line length is 88 characters", None),
+        ("trees", "Oak trees can live for centuries", None),
+    ])
+    assert store.query("initialize database", top_k=1)[0][0] == "db"
+
+
+def test_openai_embedder_orders_by_index():
+    client = FakeEmbeddingClient(dim=8)
+    vecs = OpenAIEmbedder("fake", 8, client).embed(["a", "b"])
+    assert np.allclose(vecs, [client.vector("a"), client.vector("b")])
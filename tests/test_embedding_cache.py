@@ -0,0 +1,45 @@
+# tests/test_embedding_cache.py
+
+import numpy as np
+from orchestrai.memory.embedding_cache import EmbeddingCache
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+from tests.test_vector_memory import FakeEmbeddingClient
+
+
+def test_lru_eviction_and_counters():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("m", "a", np.ones(4))
+    cache.put("m", "b", np.ones(4) * 2)
+    assert cache.get("m", "a") is not None      # hit; "b" is now the LRU entry
+    cache.put("m", "c", np.ones(4) * 3)         # evicts "b"
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "  c ") is not None   # whitespace-normalized key
+    assert cache.get("other-model", "a") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+    assert len(cache) == 2
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db_file = str(tmp_path / "embeddings.db")
+    EmbeddingCache(db_path=db_file).put("m", "hello", np.arange(4, dtype="float32"))
+
+    cache = EmbeddingCache(db_path=db_file)
+    vec = cache.get("m", "hello")
+    assert vec.tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_store_reuses_cached_embeddings():
+    client = FakeEmbeddingClient()
+    cache = EmbeddingCache()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, cache=cache)
+
+    store.add_many([("k1", "same text", None), ("k2", "same text", None)])
+    store.query("same text", top_k=1)
+    store.query("same text", top_k=1)
+
+    # one remote request for the single distinct text, then only cache hits
+    assert client.calls == [["same text"]]
+    assert cache.stats()["hits"] == 2
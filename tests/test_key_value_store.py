@@ -2,6 +2,7 @@
 
 import os
 import sqlite3
+import time
 import pytest
 from orchestrai.memory.stores.key_value_store import KeyValueStore
 
@@ -33,3 +34,213 @@ def test_kv_store_crud(tmp_path):
     store.delete("foo")
     assert store.get("foo") is None
     assert store.keys() == ["hello"]
+
+
+def test_kv_store_bulk_writes_and_transaction(tmp_path):
+    store = KeyValueStore(str(tmp_path / "bulk.db"), durability="wal")
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    store.set_many({f"k{i}": str(i) for i in range(100)})
+    store.delete_many(f"k{i}" for i in range(50))
+    assert sorted(store.keys()) == sorted(f"k{i}" for i in range(50, 100))
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.set("k50", "changed")
+            store.delete("k51")
+            raise RuntimeError("abort")
+    assert store.get("k50") == "50" and store.get("k51") == "51"
+
+    with store.transaction():
+        store.set("k50", "changed")
+        with store.transaction():
+            store.delete("k51")
+    other = sqlite3.connect(str(tmp_path / "bulk.db"))
+    assert other.execute("SELECT value FROM kv_store WHERE key = 'k50'").fetchone() == ("changed",)
+    assert other.execute("SELECT COUNT(*) FROM kv_store").fetchone() == (49,)
+
+
+def test_kv_store_group_commit(tmp_path):
+    db_file = str(tmp_path / "group.db")
+    store = KeyValueStore(db_file, group_commit_size=3)
+    other = sqlite3.connect(db_file)
+    count = lambda: other.execute("SELECT COUNT(*) FROM kv_store").fetchone()[0]
+
+    store.set("a", "1")
+    store.set("b", "2")
+    assert store.get("a") == "1"  # visible to the writer before commit
+    assert count() == 0
+    store.set("c", "3")
+    assert count() == 3
+
+    timed = KeyValueStore(str(tmp_path / "timed.db"), group_commit_ms=20)
+    timed.set("x", "1")
+    timed_other = sqlite3.connect(str(tmp_path / "timed.db"))
+    deadline = time.monotonic() + 2
+    while timed_other.execute("SELECT COUNT(*) FROM kv_store").fetchone()[0] == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    store.set("d", "4")
+    store.close()
+    assert count() == 4
+
+
+def test_kv_store_cache_and_get_many(tmp_path):
+    db_file = str(tmp_path / "cached.db")
+    store = KeyValueStore(db_file, cache_size=2, version_check_ms=0)
+    store.set_many({"user.name": "Akash", "user.city": "Pune", "a": "1"})
+
+    assert store.get_many(["a", "missing", "user.name", "a"]) == ["1", None, "Akash", "1"]
+    assert store.get("user.name") == "Akash"
+    assert store.get("missing") is None
+    assert store.stats()["hits"] == 2 and store.stats()["size"] == 2
+
+    # own writes invalidate the touched key
+    store.set("user.name", "Ada")
+    assert store.get("user.name") == "Ada"
+
+    # commits from another connection are noticed through data_version
+    other = KeyValueStore(db_file)
+    other.set("user.name", "Grace")
+    assert store.get("user.name") == "Grace"
+    assert store.get_many([]) == []
+
+
+def test_kv_store_cache_checks_data_version_sparingly(tmp_path):
+    def pragmas(store, fn):
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+        fn()
+        store.conn.set_trace_callback(None)
+        return sum("data_version" in s for s in statements)
+
+    memory = KeyValueStore(":memory:", cache_size=8)
+    memory.set("a", 1)
+    assert pragmas(memory, lambda: [memory.get("a") for _ in range(10)]) == 0
+
+    db_file = str(tmp_path / "versioned.db")
+    store = KeyValueStore(db_file, cache_size=8)
+    store.set("a", 1)
+    # a miss checks once, not once in get and again in get_many
+    assert pragmas(store, lambda: store.get("a")) == 1
+    assert pragmas(store, lambda: store.get("missing")) == 1
+
+    # an interval lets hot reads skip the check
+    lazy = KeyValueStore(db_file, cache_size=8, version_check_ms=50)
+    lazy.get("a")
+    assert pragmas(lazy, lambda: [lazy.get("a") for _ in range(10)]) == 0
+    time.sleep(0.06)
+    KeyValueStore(db_file).set("a", 2)
+    assert lazy.get("a") == 2
+
+
+def test_kv_store_root_scans_are_index_ranges(tmp_path):
+    store = KeyValueStore(str(tmp_path / "root.db"))
+    store.namespace("big").set_many((f"k{i}", i) for i in range(1000))
+    store.set_many({"a": 1, "b": "two"})
+
+    statements = []
+    store.conn.set_trace_callback(statements.append)
+    assert store.keys() == ["a", "b"]
+    assert list(store.scan()) == [("a", 1), ("b", "two")]
+    store.conn.set_trace_callback(None)
+
+    assert statements[0].startswith("SELECT key FROM")
+    for sql in statements:
+        plan = " ".join(row[3] for row in store.conn.execute("EXPLAIN QUERY PLAN " + sql))
+        assert "kv_store_root_keys" in plan
+    assert store.namespace("big").keys()[:2] == ["k0", "k1"]
+
+
+def test_kv_store_namespaces_ttl_and_scan(tmp_path):
+    store = KeyValueStore(str(tmp_path / "ns.db"), cache_size=16)
+    store.set("user.name", "root")
+    alice = store.namespace("alice")
+    bob = store.namespace("bob")
+    alice.set_many({"user.name": "Alice", "user.city": "Pune", "session.id": "s1"})
+    bob.set("user.name", "Bob")
+    alice.namespace("chat").set("turn", "1")
+
+    assert store.get("user.name") == "root"
+    assert alice.get("user.name") == "Alice" and bob.get("user.name") == "Bob"
+    assert store.keys() == ["user.name"]
+    assert alice.keys() == ["session.id", "user.city", "user.name"]
+    assert list(alice.scan("user.", batch_size=1)) == [("user.city", "Pune"), ("user.name", "Alice")]
+
+    # expired keys read as missing at once and are removed by the sweeper
+    alice.set("otp", "1234", ttl=0.05)
+    store.set("token", "t", ttl=-1)
+    assert alice.get("otp") == "1234"
+    assert store.get("token") is None and store.get_many(["token"]) == [None]
+    time.sleep(0.06)
+    assert alice.get("otp") is None and "otp" not in alice.keys()
+    assert store.sweep_expired() == 2
+    assert store.conn.execute("SELECT COUNT(*) FROM kv_store").fetchone() == (6,)
+
+    assert alice.clear() == 4
+    assert alice.keys() == [] and bob.keys() == ["user.name"]
+    with pytest.raises(ValueError):
+        store.namespace("bad\x1fname")
+    store.close()
+
+
+def test_kv_store_migrates_legacy_table(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE kv_store (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT INTO kv_store VALUES ('foo', 'bar')")
+    conn.commit()
+
+    store = KeyValueStore(db_file, sweep_interval=0.01)
+    assert store.get("foo") == "bar"
+    store.set("tmp", "x", ttl=0.01)
+    deadline = time.monotonic() + 2
+    while store.conn.execute("SELECT COUNT(*) FROM kv_store").fetchone()[0] > 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    store.close()
+
+
+def test_kv_store_typed_values_and_compression(tmp_path):
+    fact = {"type": "preference", "text": "likes green tea", "confidence": 0.92, "tags": ["drink"]}
+    values = {
+        "s": "plain text", "i": 42, "big": 1 << 70, "f": 0.1 + 0.2, "nan": float("inf"),
+        "b": True, "raw": b"\x00\x01", "fact": fact, "list": [1, "two", None], "none": None,
+        "long": "word " * 500,
+    }
+    for db_file, legacy in ((tmp_path / "typed.db", False), (tmp_path / "legacy.db", True)):
+        if legacy:
+            conn = sqlite3.connect(str(db_file))
+            conn.execute("CREATE TABLE kv_store (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT INTO kv_store VALUES ('old', 'text value')")
+            conn.commit()
+        store = KeyValueStore(str(db_file), compression="zlib", compress_threshold=256)
+        store.set_many(values)
+        assert store.get_many(list(values)) == list(values.values())
+        assert all(type(store.get(k)) is type(v) for k, v in values.items())
+        assert dict(store.scan("f")) == {"f": 0.1 + 0.2, "fact": fact}
+        if legacy:
+            assert store.get("old") == "text value"
+        store.close()
+
+    conn = sqlite3.connect(str(tmp_path / "typed.db"))
+    row = dict((k, (typeof, vtype)) for k, typeof, vtype in conn.execute(
+        "SELECT key, typeof(value), vtype FROM kv_store"))
+    assert row["i"] == ("integer", 1) and row["f"] == ("real", 2) and row["s"] == ("text", None)
+    # the long string is stored compressed
+    assert row["long"][0] == "blob" and row["long"][1] & 0x10
+    assert conn.execute("SELECT value FROM kv_store WHERE key = 'fact'").fetchone()[0] == \
+        b'{"type":"preference","text":"likes green tea","confidence":0.92,"tags":["drink"]}'
+
+
+def test_kv_store_msgpack_codec(tmp_path):
+    pytest.importorskip("msgpack")
+    from orchestrai.memory.codecs import MsgpackCodec
+
+    db_file = str(tmp_path / "packed.db")
+    store = KeyValueStore(db_file, codec=MsgpackCodec())
+    store.set("fact", {"a": [1, 2], "b": b"x"})
+    store.close()
+    # rows remember their codec, so a JSON-configured store still reads them
+    assert KeyValueStore(db_file).get("fact") == {"a": [1, 2], "b": b"x"}
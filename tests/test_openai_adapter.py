@@ -2,11 +2,15 @@
 import os
 os.environ["OPENAI_API_KEY"] = "test"    # ← prevent OpenAIError in tests
 
+import asyncio
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock
 import openai
 from orchestrai.memory.stores.rolling_buffer import RollingBufferStore
 from orchestrai.memory.adapters.openai_adapter import OpenAIAdapter
+from orchestrai.memory.adapters.async_openai_adapter import AsyncOpenAIAdapter
 
 @patch("openai.chat.completions.create")
 def test_openai_adapter_basic(mock_create):
@@ -27,3 +31,129 @@ def test_openai_adapter_basic(mock_create):
     entries = store.query("", top_k=2)
     assert entries[0][:2] == ("user", "Hello")
     assert entries[1][:2] == ("assistant", "OK!")
+
+
+class FakeAsyncClient:
+    """Stand-in for `openai.AsyncOpenAI` that answers after `latency` seconds."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.payloads = []
+        self.chat = MagicMock()
+        self.chat.completions.create = self._create
+
+    async def _create(self, model, messages, **kwargs):
+        self.payloads.append(messages)
+        await asyncio.sleep(self.latency)
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=f"re: {messages[-1]['content']}"))])
+
+
+def test_async_openai_adapter_defers_reply_write():
+    client = FakeAsyncClient()
+    store = RollingBufferStore(max_size=10)
+    store.add("user", "earlier")
+    adapter = AsyncOpenAIAdapter(memory=store, model="test-model", client=client)
+
+    async def main():
+        reply = await adapter.call([{"role": "user", "content": "Hello"}])
+        await adapter.flush()
+        return reply
+
+    assert asyncio.run(main()) == "re: Hello"
+    # the incoming message is sent once, after the retrieved context
+    assert client.payloads[0] == [
+        {"role": "user", "content": "earlier"},
+        {"role": "user", "content": "Hello"},
+    ]
+    assert [entry[:2] for entry in store.query("", top_k=3)] == [
+        ("user", "earlier"), ("user", "Hello"), ("assistant", "re: Hello"),
+    ]
+
+
+def test_async_openai_adapter_serves_conversations_concurrently():
+    client = FakeAsyncClient(latency=0.05)
+    adapters = [AsyncOpenAIAdapter(memory=RollingBufferStore(), client=client) for _ in range(200)]
+
+    async def main():
+        replies = await asyncio.gather(
+            *(a.call([{"role": "user", "content": f"q{i}"}]) for i, a in enumerate(adapters))
+        )
+        await asyncio.gather(*(a.flush() for a in adapters))
+        return replies
+
+    start = time.perf_counter()
+    replies = asyncio.run(main())
+    assert time.perf_counter() - start < 2.0
+    assert replies == [f"re: q{i}" for i in range(200)]
+    assert all(len(a.memory) == 2 for a in adapters)
+
+
+def fake_chunks(*pieces):
+    return [MagicMock(choices=[MagicMock(delta=MagicMock(content=p))]) for p in pieces]
+
+
+@patch("openai.chat.completions.create")
+def test_openai_adapter_stream_writes_reply_once(mock_create):
+    mock_create.return_value = iter(fake_chunks("He", None, "llo", "!"))
+    store = RollingBufferStore(max_size=10)
+    adapter = OpenAIAdapter(memory=store, model="test-model")
+
+    assert list(adapter.stream([{"role": "user", "content": "Hi"}])) == ["He", "llo", "!"]
+    assert mock_create.call_args.kwargs["stream"] is True
+    assert [entry[:2] for entry in store.query("", top_k=5)] == [("user", "Hi"), ("assistant", "Hello!")]
+
+    # stopping early still stores what arrived, flagged as truncated
+    mock_create.return_value = iter(fake_chunks("a", "b", "c"))
+    stream = adapter.stream([{"role": "user", "content": "More"}])
+    assert next(stream) == "a"
+    stream.close()
+    assert store.query("", top_k=1)[0] == ("assistant", "a", {"truncated": True})
+    assert len(store) == 4
+
+
+def test_async_openai_adapter_stream_cancelled_part_way():
+    class StreamingClient(FakeAsyncClient):
+        async def _create(self, model, messages, stream=False, **kwargs):
+            async def chunks():
+                for piece in fake_chunks("one ", "two ", "three"):
+                    yield piece
+                    await asyncio.sleep(0.05)
+            return chunks()
+
+    store = RollingBufferStore(max_size=10)
+    adapter = AsyncOpenAIAdapter(memory=store, client=StreamingClient())
+
+    async def consume(received):
+        async for piece in adapter.stream([{"role": "user", "content": "count"}]):
+            received.append(piece)
+
+    async def main():
+        received = []
+        task = asyncio.ensure_future(consume(received))
+        await asyncio.sleep(0.07)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await adapter.flush()
+        return received
+
+    assert asyncio.run(main()) == ["one ", "two "]
+    assert store.query("", top_k=1)[0] == ("assistant", "one two ", {"truncated": True})
+
+
+@patch("openai.chat.completions.create")
+def test_openai_adapter_sends_each_turn_once_and_reports_savings(mock_create):
+    mock_create.return_value = MagicMock(choices=[MagicMock(message=MagicMock(content="OK!"))])
+    store = RollingBufferStore(max_size=10)
+    adapter = OpenAIAdapter(memory=store, model="test-model")
+
+    adapter.call([{"role": "user", "content": "Hello"}])
+    adapter.call([{"role": "user", "content": "Again"}])
+
+    assert mock_create.call_args.kwargs["messages"] == [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "content": "OK!"},
+        {"role": "user", "content": "Again"},
+    ]
+    # the just-written "Again" was not sent twice
+    assert adapter.last_prompt.tokens_saved > 0
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from orchestrai.memory.adapters.openai_adapter import OpenAIAdapter
+from orchestrai.memory.openai_client import RateLimit, ResilientOpenAIClient, TokenBucket
+from orchestrai.memory.stores.rolling_buffer import RollingBufferStore
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.peers.add(self.client_address)
+            server.requests += 1
+            step = server.script.pop(0) if server.script else {}
+        time.sleep(step.get("delay", 0))
+        status = step.get("status", 200)
+        if status != 200:
+            payload = {"error": {"message": "stub error", "type": "stub"}}
+        elif self.path.endswith("/embeddings"):
+            payload = {
+                "object": "list",
+                "model": body["model"],
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0, 0.0]}
+                    for i, text in enumerate(body["input"])
+                ],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }
+        else:
+            payload = {
+                "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": step.get("content", "stub reply")},
+                }],
+            }
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in step.get("headers", {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # the losing hedge's connection is closed before it is answered
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.peers = set()
+    server.requests = 0
+    server.script = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, **kwargs):
+    return ResilientOpenAIClient(
+        api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1", **kwargs
+    )
+
+
+def test_retries_rate_limits_over_one_pooled_connection(stub):
+    stub.script = [{"status": 429, "headers": {"retry-after-ms": "10"}}, {"status": 503}]
+    client = make_client(stub, backoff_base=0.01, rate_limits={"test-model": RateLimit(requests_per_minute=6000)})
+    adapter = OpenAIAdapter(memory=RollingBufferStore(), model="test-model", client=client)
+
+    assert adapter.call([{"role": "user", "content": "hi"}]) == "stub reply"
+    assert client.retries == 2
+
+    store = VectorMemoryStore(embed_model="stub-embed", dim=3, client=client)
+    store.add("a", "short")
+    store.add("b", "a much longer text")
+    assert store.query("short", top_k=1)[0][0] == "a"
+    # every request went over the same kept-alive connection
+    assert len(stub.peers) == 1
+    client.close()
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.script = [{"status": 400}]
+    client = make_client(stub, backoff_base=0.01)
+    with pytest.raises(openai.BadRequestError):
+        client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}])
+    assert client.retries == 0
+    client.close()
+
+
+def test_hedges_slow_requests(stub):
+    stub.script = [{"delay": 0.5, "content": "slow"}, {"content": "fast"}]
+    client = make_client(stub, hedge_after=0.05)
+
+    start = time.perf_counter()
+    resp = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}])
+    assert resp.choices[0].message.content == "fast"
+    assert time.perf_counter() - start < 0.4
+    assert client.hedges == 1
+    client.close()
+
+
+def test_hedge_timer_starts_after_the_limiter_and_hedges_need_free_tokens(stub):
+    # waiting out a paused bucket doesn't count towards hedge_after
+    client = make_client(stub, hedge_after=0.02, rate_limits={"m": RateLimit(requests_per_minute=600)})
+    client._buckets["m"]["requests"].pause(0.1)
+    client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}])
+    assert client.hedges == 0
+    assert stub.requests == 1
+    client.close()
+
+    # a slow request isn't hedged when the bucket has nothing left to spend
+    stub.script = [{"delay": 0.2}]
+    client = make_client(stub, hedge_after=0.02, rate_limits={"m": RateLimit(requests_per_minute=1)})
+    client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}])
+    assert client.hedges == 0
+    assert stub.requests == 2
+    client.close()
+
+
+def test_token_bucket_paces_and_pauses():
+    bucket = TokenBucket(rate=100.0, capacity=1)
+    start = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.perf_counter() - start >= 0.04
+
+    bucket.pause(0.05)
+    start = time.perf_counter()
+    bucket.acquire()
+    assert time.perf_counter() - start >= 0.04
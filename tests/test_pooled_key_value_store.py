@@ -0,0 +1,114 @@
+# tests/test_pooled_key_value_store.py
+
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+from orchestrai.memory.stores.pooled_key_value_store import AsyncKeyValueStore, PooledKeyValueStore
+
+
+def test_pooled_store_reads_from_worker_threads(tmp_path):
+    store = PooledKeyValueStore(str(tmp_path / "kv.db"))
+    store.set_many({f"k{i}": str(i) for i in range(100)})
+    errors = []
+
+    def reader():
+        try:
+            for i in range(100):
+                assert store.get(f"k{i}") == str(i)
+        except Exception as e:  # surfaced below
+            errors.append(e)
+
+    def writer():
+        for i in range(100, 200):
+            store.set(f"k{i}", str(i))
+
+    threads = [threading.Thread(target=reader) for _ in range(4)] + [threading.Thread(target=writer)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    # the readers' connections closed with their threads
+    assert store.reader_count == 0
+    assert len(store.keys()) == 200
+    assert store.reader_count == 1
+    store.close()
+
+    with pytest.raises(ValueError):
+        PooledKeyValueStore(":memory:")
+
+
+def test_pooled_store_does_not_leak_connections_from_short_lived_threads(tmp_path):
+    store = PooledKeyValueStore(str(tmp_path / "kv.db"))
+    store.set("a", "1")
+    readers = []
+
+    def read():
+        assert store.get("a") == "1"
+        readers.append(store._local.reader.conn)
+
+    for _ in range(50):
+        t = threading.Thread(target=read)
+        t.start()
+        t.join()
+
+    assert store.reader_count == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        readers[0].execute("SELECT 1")
+    store.close()
+
+
+def test_pooled_group_commit_reads_pending_writes(tmp_path):
+    store = PooledKeyValueStore(str(tmp_path / "kv.db"), group_commit_size=10, cache_size=8)
+    assert store.get("b") is None
+    store.set("a", "1")
+    store.set("b", "2")
+    assert store.get("a") == "1"
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(store.get_many(["a", "b"])))
+    t.start()
+    t.join()
+    assert seen == [["1", "2"]]
+
+    store.flush()
+    assert store.get("a") == "1" and store.get("b") == "2"
+    # once committed, reads go back to the reader connections
+    t = threading.Thread(target=lambda: seen.append(store.get("a")))
+    t.start()
+    t.join()
+    assert seen[-1] == "1"
+    store.close()
+
+
+def test_pooled_transaction_reads_own_writes(tmp_path):
+    store = PooledKeyValueStore(str(tmp_path / "kv.db"))
+    seen = []
+    with store.transaction():
+        store.set("a", "1")
+        assert store.get("a") == "1"
+        # another thread only sees committed data
+        t = threading.Thread(target=lambda: seen.append(store.get("a")))
+        t.start()
+        t.join()
+    assert seen == [None]
+    assert store.get("a") == "1"
+    store.close()
+
+
+def test_async_facade(tmp_path):
+    async def main():
+        kv = AsyncKeyValueStore(PooledKeyValueStore(str(tmp_path / "kv.db")), max_workers=2)
+        await kv.set("user.name", "Akash")
+        await kv.set_many([("a", "1"), ("b", "2")])
+        values = await asyncio.gather(*(kv.get(k) for k in ("user.name", "a", "b", "missing")))
+        await kv.delete_many(["a"])
+        keys = sorted(await kv.keys())
+        await kv.close()
+        return values, keys
+
+    values, keys = asyncio.run(main())
+    assert values == ["Akash", "1", "2", None]
+    assert keys == ["b", "user.name"]
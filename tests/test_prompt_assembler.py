@@ -0,0 +1,74 @@
+from orchestrai.memory.embedders import HashingEmbedder
+from orchestrai.memory.prompt_assembler import MESSAGE_OVERHEAD, PromptAssembler, memory_sections
+from orchestrai.memory.stores.composite_memory import CompositeMemoryStore
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+from orchestrai.memory.stores.rolling_buffer import RollingBufferStore
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+from orchestrai.memory.tokenizers import CachedTokenizer, CharEstimateTokenizer
+
+
+class CountingTokenizer(CharEstimateTokenizer):
+    def __init__(self):
+        super().__init__(chars_per_token=1.0)
+        self.calls = 0
+
+    def count(self, text):
+        self.calls += 1
+        return super().count(text)
+
+
+def test_assembler_dedupes_and_applies_section_budgets():
+    assembler = PromptAssembler(
+        budgets={"summary": 20, "recency": 2 * (4 + MESSAGE_OVERHEAD)},
+        tokenizer=CharEstimateTokenizer(chars_per_token=1.0),
+    )
+    sections = {
+        "summary": [("system", "old talk", {"summary_level": 0})],
+        "recency": [("user", "aaaa", {}), ("assistant", "bbbb", {}), ("user", "cccc", {}), ("user", "next", {})],
+    }
+    messages = [{"role": "user", "content": "next"}]
+
+    prompt = assembler.assemble(sections, messages)
+
+    # "next" is already sent; the recency budget fits the two newest others
+    assert prompt.messages == [
+        {"role": "system", "content": "old talk"},
+        {"role": "assistant", "content": "bbbb"},
+        {"role": "user", "content": "cccc"},
+        {"role": "user", "content": "next"},
+    ]
+    per_message = 4 + MESSAGE_OVERHEAD
+    assert prompt.prompt_tokens == 8 + MESSAGE_OVERHEAD + 3 * per_message
+    assert prompt.tokens_saved == 2 * per_message
+
+
+def test_memory_sections_split_summaries_and_cache_token_counts():
+    store = RollingBufferStore()
+    store.add("system", "summary so far", {"summary_level": 1})
+    store.add("user", "hello")
+    sections = memory_sections(store, "hello")
+    assert sections["summary"] == [("system", "summary so far", {"summary_level": 1})]
+    assert [e[1] for e in sections["recency"]] == ["hello"]
+
+    counting = CountingTokenizer()
+    tokenizer = CachedTokenizer(counting)
+    assert [tokenizer.count("abc") for _ in range(3)] == [3, 3, 3]
+    assert counting.calls == 1
+
+
+def test_memory_sections_go_through_the_composite_kv_tier():
+    recency = RollingBufferStore()
+    recency.add("user", "my name?")
+    semantic = VectorMemoryStore(embedder=HashingEmbedder(dim=32))
+    semantic.add("s1", "semantic hit")
+    store = CompositeMemoryStore(recency, semantic, kv_store=KeyValueStore(":memory:"))
+    store.kv_set("user", "Ada")
+    store.kv_set("user.city", "London")
+
+    # an exact KV key doesn't short-circuit the other sections
+    sections = memory_sections(store, "user")
+    assert [e[1] for e in sections["system"]] == ["user: Ada", "user.city: London"]
+    assert [e[1] for e in sections["semantic"]] == ["semantic hit"]
+    assert [e[1] for e in sections["recency"]] == ["my name?"]
+    assert store.last_errors == {}
+    store.close()
@@ -0,0 +1,52 @@
+# tests/test_sharded_vector_memory.py
+
+from orchestrai.memory.embedders import HashingEmbedder
+from orchestrai.memory.stores.composite_memory import CompositeMemoryStore
+from orchestrai.memory.stores.rolling_buffer import RollingBufferStore
+from orchestrai.memory.stores.sharded_vector_memory import ShardedVectorMemoryStore
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+
+ENTRIES = [(f"k{i}", f"note number {i} about topic {i % 7}", {"i": i}) for i in range(200)]
+
+
+def test_sharded_matches_single_store():
+    embedder = HashingEmbedder(dim=32)
+    single = VectorMemoryStore(embedder=embedder)
+    sharded = ShardedVectorMemoryStore(n_shards=4, embedder=embedder)
+    single.add_many(ENTRIES)
+    sharded.add_many(ENTRIES)
+
+    assert len(sharded) == 200
+    assert all(len(shard) > 20 for shard in sharded.shards)
+    for q in ("note number 17", "topic 3", "about"):
+        assert sharded.query_with_scores(q, top_k=8) == single.query_with_scores(q, top_k=8)
+    queries = ["note number 17", "topic 3", "about"]
+    assert sharded.query_many(queries, top_k=8) == single.query_many(queries, top_k=8)
+    sharded.close()
+
+
+def test_sharded_delete_upsert_and_snapshot(tmp_path):
+    embedder = HashingEmbedder(dim=32)
+    store = ShardedVectorMemoryStore(n_shards=3, embedder=embedder)
+    store.add_many(ENTRIES[:30])
+    store.add("k5", "note number 5 again", {"dup": True})
+
+    assert store.delete("k5") == 2
+    store.upsert("k6", "replacement for six", {"i": 66})
+    assert len(store) == 29
+    assert store.query("replacement for six", top_k=1) == [("k6", {"i": 66})]
+
+    store.save(str(tmp_path / "snap"))
+    loaded = ShardedVectorMemoryStore.load(str(tmp_path / "snap"), embedder=embedder)
+    assert len(loaded) == 29
+    assert loaded.query("note number 12", top_k=3) == store.query("note number 12", top_k=3)
+
+
+def test_sharded_store_drops_into_composite():
+    semantic = ShardedVectorMemoryStore(n_shards=2, embedder=HashingEmbedder(dim=32))
+    composite = CompositeMemoryStore(recency_store=RollingBufferStore(max_size=5), semantic_store=semantic)
+    composite.add("user", "my favourite colour is green", {"text": "my favourite colour is green"})
+    composite.add("user", "tell me about trees", {"text": "tell me about trees"})
+
+    hits = composite.query("favourite colour", top_k=1, use_recency=False)
+    assert hits == [("user", "my favourite colour is green", {"text": "my favourite colour is green"})]
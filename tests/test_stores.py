@@ -32,3 +32,36 @@ def test_query_less_than_buffer_size():
     assert store.query("", top_k=4) == [
         ("x", "100", {}),
     ]
+
+def test_rolling_buffer_entries_are_slotted_records():
+    store = RollingBufferStore(max_size=1000)
+    for i in range(1000):
+        store.add("user", f"m{i}", {"i": i} if i % 2 else None)
+    tail = store.query("", top_k=3)
+    assert [e.value for e in tail] == ["m997", "m998", "m999"]
+    assert tail[0] == ("user", "m997", {"i": 997})
+    assert not hasattr(tail[1], "__dict__")
+    # entries without metadata are stored with None and returned with a
+    # dict of their own
+    assert store.buffer[-2].metadata is None
+    assert tail[1].metadata == {}
+    tail[1].metadata["x"] = 1
+    assert store.query("", top_k=2)[0].metadata == {}
+    assert store.peek_oldest(1)[0].metadata == {}
+    assert store.query("", top_k=0) == []
+    assert len(store) == 1000
+
+def test_rolling_buffer_token_budget():
+    store = RollingBufferStore(max_size=4, max_tokens=10)
+    for key, text in [("a", "x" * 40), ("b", "x" * 8), ("c", "x" * 12), ("d", "x" * 16), ("e", "x" * 4)]:
+        store.add(key, text)
+    # a was evicted; tokens per entry (4 chars each): b=2, c=3, d=4, e=1
+    assert store.total_tokens == 10
+    assert [e.key for e in store.query("", top_k=10)] == ["b", "c", "d", "e"]
+    assert [e.key for e in store.query("", top_k=10, max_tokens=8)] == ["c", "d", "e"]
+    assert [e.key for e in store.query("", top_k=2, max_tokens=8)] == ["d", "e"]
+    assert store.query("", max_tokens=0) == []
+
+    # entries removed from the left by hand keep the sums in step
+    store.buffer.popleft()
+    assert store.total_tokens == 8 and store.count_within(5) == 2
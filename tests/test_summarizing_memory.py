@@ -1,7 +1,16 @@
+import threading
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock
 from orchestrai.memory.stores.rolling_buffer import RollingBufferStore
-from orchestrai.memory.stores.summarizing_memory import SummarizingMemoryStore
+from orchestrai.memory.embedders import HashingEmbedder
+from orchestrai.memory.stores.key_value_store import KeyValueStore
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+from orchestrai.memory.stores.summarizing_memory import (
+    HierarchicalSummarizingMemoryStore,
+    SummarizingMemoryStore,
+)
 
 @patch("openai.chat.completions.create")
 def test_summarizing_memory_basic(mock_create):
@@ -34,3 +43,174 @@ def test_summarizing_memory_basic(mock_create):
     assert ("user", "u2") in roles_contents
     assert ("assistant", "a2") in roles_contents
     assert ("system", "Condensed summary.") in roles_contents
+
+
+def test_summaries_keep_their_text_in_a_vector_store():
+    client = FakeChatClient()
+    client.gate.set()
+    inner = VectorMemoryStore(embedder=HashingEmbedder(dim=32))
+    store = SummarizingMemoryStore(inner, threshold=3, chunk_size=2, client=client)
+
+    for i in range(4):
+        store.add(f"k{i}", f"fact {i}")
+
+    summary = "summary of k0: fact 0 | k1: fact 1"
+    assert inner.peek_oldest(3)[-1] == ("system", summary, {"content": summary, "summary_level": 0})
+    hits = inner.query_with_scores(summary, top_k=1)
+    assert hits[0][:2] == ("system", {"content": summary, "summary_level": 0})
+
+    # the next round summarizes the earlier summary's text, not a blank line
+    for i in range(4, 6):
+        store.add(f"k{i}", f"fact {i}")
+    assert client.prompts[-1] == f"system: {summary}\nk4: fact 4"
+
+
+class FakeChatClient:
+    """Stand-in for `openai` whose completions wait for `gate` and echo the prompt."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.delay = 0.0
+        self.prompts = []
+        self.chat = MagicMock()
+        self.chat.completions.create.side_effect = self._create
+
+    def _create(self, model, messages, **kwargs):
+        self.gate.wait(timeout=5)
+        time.sleep(self.delay)
+        self.prompts.append(messages[1]["content"])
+        summary = "summary of " + messages[1]["content"].replace("\n", " | ")
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=summary))])
+
+
+def test_background_summarization_does_not_block_add():
+    client = FakeChatClient()
+    inner = RollingBufferStore(max_size=50)
+    store = SummarizingMemoryStore(inner, threshold=3, chunk_size=2, client=client, background=True)
+
+    for i in range(6):
+        store.add("user", f"u{i}")
+    # the LLM is still blocked, yet every add returned and nothing was lost
+    assert [c for _, c, _ in store.query("", top_k=10)] == [f"u{i}" for i in range(6)]
+
+    client.gate.set()
+    store.flush()
+    assert client.prompts == ["user: u0\nuser: u1", "user: u2\nuser: u3"]
+    contents = [c for _, c, _ in store.query("", top_k=10)]
+    assert contents == ["u4", "u5", "summary of user: u0 | user: u1", "summary of user: u2 | user: u3"]
+    store.close()
+
+
+def test_background_summaries_interleaved_with_adds_replace_their_chunks():
+    client = FakeChatClient()
+    client.gate.set()
+    client.delay = 0.02
+    inner = RollingBufferStore(max_size=200)
+    store = SummarizingMemoryStore(inner, threshold=6, chunk_size=3, client=client, background=True)
+
+    for i in range(40):
+        store.add("user", f"u{i}")
+        time.sleep(0.005)
+    store.flush()
+
+    raw = [c for k, c, _ in inner.buffer if k == "user"]
+    summarized = [line for p in client.prompts for line in p.split("\n")]
+    # every message is either still raw or was summarized exactly once
+    contents = raw + [line[len("user: "):] for line in summarized if line.startswith("user: ")]
+    assert sorted(contents, key=lambda c: int(c[1:])) == [f"u{i}" for i in range(40)]
+    assert len(inner) < 12
+    store.close()
+
+
+def test_background_summarization_surfaces_errors():
+    client = FakeChatClient()
+    client.gate.set()
+    client.chat.completions.create.side_effect = RuntimeError("rate limited")
+    inner = RollingBufferStore(max_size=50)
+    store = SummarizingMemoryStore(inner, threshold=2, chunk_size=2, client=client, background=True)
+
+    for i in range(3):
+        store.add("user", f"u{i}")
+    with pytest.raises(RuntimeError):
+        store.flush()
+    # the chunk was left in place
+    assert len(inner.buffer) == 3
+    store.close()
+
+
+def test_hierarchical_summaries_merge_with_bounded_llm_calls():
+    client = FakeChatClient()
+    client.gate.set()
+    inner = RollingBufferStore(max_size=50)
+    # every "uNN" message costs one token, so each chunk holds two entries
+    store = HierarchicalSummarizingMemoryStore(inner, threshold=4, chunk_tokens=2, fanout=2, client=client)
+
+    for i in range(20):
+        store.add("user", f"u{i:02d}")
+
+    # 16 entries were summarized in 8 chunks, merged 4 + 2 + 1 times
+    assert len(inner) == 4
+    assert store.llm_calls == 8 + 4 + 2 + 1
+    assert [len(level) for level in store.levels] == [0, 0, 0, 1]
+    results = store.query("", top_k=5)
+    assert results[0][2] == {"summary_level": 3}
+    assert "u00" in results[0][1] and "u15" in results[0][1]
+    assert [c for _, c, _ in results[1:]] == ["u16", "u17", "u18", "u19"]
+    # top_k bounds the summaries and raw entries together
+    assert [c for _, c, _ in store.query("", top_k=3)[1:]] == ["u18", "u19"]
+    assert store.query("", top_k=1) == results[:1]
+
+
+def test_hierarchical_summary_failure_keeps_entries():
+    client = FakeChatClient()
+    client.gate.set()
+    client.chat.completions.create.side_effect = RuntimeError("rate limited")
+    inner = RollingBufferStore(max_size=50)
+    store = HierarchicalSummarizingMemoryStore(inner, threshold=2, chunk_tokens=2, fanout=2, client=client)
+
+    store.add("user", "u0")
+    store.add("user", "u1")
+    with pytest.raises(RuntimeError):
+        store.add("user", "u2")
+    assert [c for _, c, _ in inner.buffer] == ["u0", "u1", "u2"]
+    assert store.levels == []
+
+    # the next add retries the same chunk
+    client.chat.completions.create.side_effect = client._create
+    store.add("user", "u3")
+    assert client.prompts == ["user: u0\nuser: u1"]
+    assert [c for _, c, _ in inner.buffer] == ["u2", "u3"]
+
+
+def test_hierarchical_summaries_over_vector_store():
+    client = FakeChatClient()
+    client.gate.set()
+    inner = VectorMemoryStore(embedder=HashingEmbedder(dim=32))
+    store = HierarchicalSummarizingMemoryStore(inner, threshold=3, chunk_tokens=100, fanout=3, client=client)
+
+    for i in range(5):
+        store.add(f"k{i}", f"fact {i}")
+
+    # the fourth add summarized everything but the newest entry
+    assert len(inner) == 2
+    assert client.prompts == ["k0: fact 0\nk1: fact 1\nk2: fact 2"]
+    assert store.summaries()[0][1] == "summary of k0: fact 0 | k1: fact 1 | k2: fact 2"
+    results = store.query("fact 4", top_k=3)
+    assert [content for _, content, _ in results[1:]] in (["fact 4", "fact 3"], ["fact 3", "fact 4"])
+    assert all(len(entry) == 3 for entry in results)
+
+
+def test_hierarchical_summaries_see_values_kept_outside_metadata():
+    client = FakeChatClient()
+    client.gate.set()
+    inner = VectorMemoryStore(embedder=HashingEmbedder(dim=32))
+    store = HierarchicalSummarizingMemoryStore(inner, threshold=2, chunk_tokens=100, client=client)
+
+    for i in range(3):
+        store.add(f"doc{i}", f"def f{i}(): pass", {"type": "docstring"})
+    assert client.prompts == ["doc0: def f0(): pass\ndoc1: def f1(): pass"]
+
+
+def test_hierarchical_summaries_reject_unordered_store():
+    with pytest.raises(TypeError):
+        HierarchicalSummarizingMemoryStore(KeyValueStore(":memory:"))
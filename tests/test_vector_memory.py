@@ -0,0 +1,441 @@
+# tests/test_vector_memory.py
+
+import threading
+import zlib
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+from orchestrai.memory.stores.vector_memory import VectorMemoryStore
+
+
+class FakeEmbeddingClient:
+    """Deterministic stand-in for `openai`: one random vector per distinct text."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.calls = []
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def vector(self, text):
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        return rng.standard_normal(self.dim).astype("float32")
+
+    def _create(self, model, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.calls.append(texts)
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=self.vector(t).tolist())
+            for i, t in enumerate(texts)
+        ])
+
+
+def test_add_many_batches_by_entry_count():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, batch_size=4)
+
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(10))
+
+    assert [len(c) for c in client.calls] == [4, 4, 2]
+    assert store.index.ntotal == 10
+    assert store.metadatas[3] == ("k3", {"content": "value 3"})
+    assert store.query("value 7", top_k=1) == [("k7", {"content": "value 7"})]
+
+
+def test_add_many_batches_by_token_budget():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(
+        embed_model="fake", dim=8, client=client, batch_size=100, max_batch_tokens=10
+    )
+
+    # each value is ~5 estimated tokens, so only two fit per request
+    store.add_many((f"k{i}", "x" * 20, None) for i in range(5))
+
+    assert [len(c) for c in client.calls] == [2, 2, 1]
+
+
+def test_write_behind_coalesces_and_flushes():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(
+        embed_model="fake", dim=8, client=client, batch_size=16, write_behind=True
+    )
+
+    for i in range(40):
+        store.add(f"k{i}", f"value {i}", {"i": i})
+    store.flush()
+
+    assert store.index.ntotal == 40
+    assert sum(len(c) for c in client.calls) == 40
+    assert all(len(c) <= 16 for c in client.calls)
+    assert store.query("value 12", top_k=1) == [("k12", {"i": 12})]
+    store.close()
+
+
+def test_ivf_index_trains_in_background_and_keeps_answering():
+    client = FakeEmbeddingClient(dim=16)
+    store = VectorMemoryStore(
+        embed_model="fake", dim=16, client=client,
+        index_type="ivf_flat", nlist=4, train_size=200,
+    )
+
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(150))
+    assert not store.is_trained
+    assert store.query("value 42", top_k=1) == [("k42", {"content": "value 42"})]
+
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(150, 300))
+    store.wait_for_index()
+
+    assert store.is_trained
+    assert store.index.ntotal == 300
+    # probing every list makes IVF exact
+    assert store.query("value 250", top_k=1, nprobe=4) == [("k250", {"content": "value 250"})]
+
+
+def test_hnsw_index_with_per_query_ef_search():
+    client = FakeEmbeddingClient(dim=16)
+    store = VectorMemoryStore(embed_model="fake", dim=16, client=client, index_type="hnsw")
+
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(100))
+
+    assert store.is_trained
+    assert store.query("value 7", top_k=1, ef_search=128) == [("k7", {"content": "value 7"})]
+
+
+def test_snapshot_roundtrip_is_mmapped_and_incremental(tmp_path):
+    client = FakeEmbeddingClient()
+    snap = str(tmp_path / "snap")
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client)
+    store.add_many((f"k{i}", f"value {i}", {"i": i}) for i in range(20))
+    store.save(snap)
+
+    loaded = VectorMemoryStore.load(snap, client=client)
+    assert loaded.embed_model == "fake" and len(loaded) == 20
+    assert loaded.query("value 3", top_k=1) == [("k3", {"i": 3})]
+
+    # appends land in the tail and are saved without rewriting the base
+    base_file = tmp_path / "snap" / "index-1.faiss"
+    base_mtime = base_file.stat().st_mtime_ns
+    loaded.add("new", "brand new entry", {"i": 99})
+    loaded.save(snap, compact=False)
+    assert base_file.stat().st_mtime_ns == base_mtime
+
+    reloaded = VectorMemoryStore.load(snap, client=client)
+    assert len(reloaded) == 21
+    assert reloaded.query("brand new entry", top_k=1) == [("new", {"i": 99})]
+
+    # compaction folds the tail into a new base generation
+    reloaded.save(snap, compact=True)
+    assert not base_file.exists()
+    final = VectorMemoryStore.load(snap, client=client, mmap=False)
+    assert final.index.ntotal == 21
+    assert final.query("value 17", top_k=1) == [("k17", {"i": 17})]
+
+
+def test_snapshot_survives_a_save_interrupted_before_the_manifest(tmp_path, monkeypatch):
+    client = FakeEmbeddingClient()
+    snap = str(tmp_path / "snap")
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client)
+    store.add_many((f"k{i}", f"value {i}", {"i": i}) for i in range(10))
+    store.save(snap)
+    store.delete("k0")
+    store.add("new", "brand new entry", {"i": 99})
+
+    def crash():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_write_manifest", crash)
+    with pytest.raises(OSError):
+        store.save(snap, compact=True)
+
+    # the previous generation is still whole: index and metadata agree
+    loaded = VectorMemoryStore.load(snap, client=client)
+    assert len(loaded) == 10
+    assert loaded.query("value 0", top_k=1) == [("k0", {"i": 0})]
+
+
+def test_searches_run_outside_the_store_lock_alongside_writes(tmp_path):
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, compact_threshold=0.5)
+    store.add_many((f"k{i}", f"value {i}", {"i": i}) for i in range(200))
+    store.save(str(tmp_path / "snap"))
+    errors = []
+
+    def search():
+        try:
+            for _ in range(50):
+                assert store.query("value 7", top_k=1) == [("k7", {"i": 7})]
+        except Exception as e:  # surfaced below
+            errors.append(e)
+
+    def write():
+        for r in range(20):
+            store.add_many((f"w{r}-{i}", f"write {r} {i}", None) for i in range(20))
+            store.upsert_many((f"k{i}", f"value {i}", {"i": i}) for i in range(100, 120))
+            if r % 5 == 0:
+                store.save(str(tmp_path / "snap"), compact=r % 10 == 0)
+
+    threads = [threading.Thread(target=search) for _ in range(4)] + [threading.Thread(target=write)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.wait_for_index()
+
+    assert errors == []
+    assert len(store) == 600
+
+
+def test_search_sees_one_snapshot_while_a_compaction_swaps_indexes():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, compact_threshold=10.0)
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(4))
+    store.pop_oldest(3)
+    store.add("k4", "value 4")
+
+    take_view = store._view
+
+    def view_then_compact():
+        view = take_view()
+        # the rebuild finishes (and clears the tombstones) mid-query
+        store.compact()
+        return view
+
+    store._view = view_then_compact
+    # k0 is the nearest vector but was tombstoned in the searched index
+    hits = store.query("value 0", top_k=1)
+    assert len(hits) == 1 and hits[0][0] in ("k3", "k4")
+
+
+def test_oldest_entries_keep_values_not_in_metadata(tmp_path):
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client)
+    store.add("doc0", "def f(): pass", {"type": "docstring"})
+    store.add("doc1", "plain value")
+    snap = str(tmp_path / "snap")
+    store.save(snap)
+    store.add("doc2", "class C: ...", {"type": "docstring"})
+    store.save(snap, compact=False)
+
+    loaded = VectorMemoryStore.load(snap, client=client)
+    expected = [
+        ("doc0", "def f(): pass", {"type": "docstring"}),
+        ("doc1", "plain value", {"content": "plain value"}),
+        ("doc2", "class C: ...", {"type": "docstring"}),
+    ]
+    assert loaded.peek_oldest(3) == expected
+    assert loaded.pop_oldest(1) == expected[:1]
+    assert loaded._values == {2: "class C: ..."}
+
+
+def test_upsert_delete_and_overfetch_past_tombstones():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, compact_threshold=1.0)
+    store.add_many((f"k{i}", f"value {i}", {"i": i}) for i in range(10))
+
+    store.upsert("k3", "value 3", {"i": 33})
+    assert len(store) == 10
+    assert store.query("value 3", top_k=1) == [("k3", {"i": 33})]
+
+    # delete the nearest neighbours of the query; the rest must still fill top_k
+    for i in range(8):
+        assert store.delete(f"k{i}") == 1
+    assert store.delete("missing") == 0
+    assert store.tombstones == 9
+    assert sorted(key for key, _ in store.query("value 0", top_k=5)) == ["k8", "k9"]
+
+
+def test_compaction_keeps_index_flat_under_churn():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, compact_threshold=0.5)
+    for round_ in range(20):
+        store.upsert_many((f"k{i}", f"value {i} v{round_}", {"round": round_}) for i in range(10))
+        store.wait_for_index()
+
+    assert len(store) == 10
+    assert store.index.ntotal <= 20
+    assert store.query("value 4 v19", top_k=1) == [("k4", {"round": 19})]
+
+    store.compact()
+    assert store.tombstones == 0 and store.index.ntotal == 10
+
+
+def test_compaction_reuses_the_trained_ivf_pq_codebooks():
+    client = FakeEmbeddingClient(dim=16)
+    store = VectorMemoryStore(
+        embed_model="fake", dim=16, client=client,
+        index_type="ivf_pq", nlist=4, pq_m=4, train_size=1100, compact_threshold=1.0,
+    )
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(1100))
+    store.wait_for_index()
+    assert store.is_trained
+
+    def codebooks():
+        inner = faiss.downcast_index(store.index.index)
+        centroids = faiss.downcast_index(inner.quantizer).reconstruct_n(0, inner.nlist)
+        return centroids, faiss.vector_to_array(inner.pq.centroids)
+
+    raw = np.stack([client.vector(f"value {i}") for i in range(1100)])
+
+    def error():
+        inner = faiss.downcast_index(store.index.index)
+        return np.linalg.norm(inner.reconstruct_n(0, inner.ntotal) - raw, axis=1).mean()
+
+    before, initial = codebooks(), error()
+    for _ in range(5):
+        store.compact()
+    after = codebooks()
+    assert np.array_equal(before[0], after[0]) and np.array_equal(before[1], after[1])
+    # re-encoding decoded vectors with the same codebooks doesn't compound the loss
+    assert error() < initial * 1.1
+
+    store.delete("k0")
+    store.compact()
+    assert store.index.ntotal == 1099
+    assert np.array_equal(codebooks()[1], before[1])
+
+
+def test_ivf_pq_stays_flat_below_the_codebook_minimum(monkeypatch):
+    client = FakeEmbeddingClient(dim=16)
+    store = VectorMemoryStore(
+        embed_model="fake", dim=16, client=client,
+        index_type="ivf_pq", nlist=4, pq_m=4, train_size=100,
+    )
+    builds = []
+    rebuild = store._rebuild
+    monkeypatch.setattr(store, "_rebuild", lambda min_train: builds.append(min_train) or rebuild(min_train))
+
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(150))
+    store.wait_for_index()
+    assert builds == []
+
+    store.build_index()
+    assert not store.is_trained and builds == [256]
+    assert store.query("value 7", top_k=1)[0][0] == "k7"
+
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(150, 300))
+    store.wait_for_index()
+    assert store.is_trained and len(builds) == 2
+
+
+def test_failed_background_build_is_reported_once_and_not_retried(monkeypatch):
+    client = FakeEmbeddingClient(dim=16)
+    store = VectorMemoryStore(
+        embed_model="fake", dim=16, client=client, index_type="ivf_flat", nlist=4, train_size=20,
+    )
+    builds = []
+
+    def train(vecs):
+        builds.append(len(vecs))
+        raise RuntimeError("training failed")
+
+    new_index = lambda: SimpleNamespace(is_trained=False, train=train)
+
+    monkeypatch.setattr(store, "_new_index", new_index)
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(20))
+    with pytest.raises(RuntimeError, match="training failed"):
+        store.wait_for_index()
+    store.wait_for_index()
+
+    store.add("k20", "value 20")
+    store.wait_for_index()
+    assert builds == [20] and not store.is_trained
+
+
+def test_snapshot_replays_deletes(tmp_path):
+    client = FakeEmbeddingClient()
+    snap = str(tmp_path / "snap")
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, compact_threshold=1.0)
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(5))
+    store.save(snap)
+
+    store.delete("k1")
+    store.upsert("k2", "value 2", {"fresh": True})
+    store.save(snap, compact=False)
+
+    loaded = VectorMemoryStore.load(snap, client=client)
+    assert len(loaded) == 4 and loaded.tombstones == 2
+    assert loaded.query("value 1", top_k=5)[0][0] != "k1"
+    assert ("k2", {"fresh": True}) in loaded.query("value 2", top_k=5)
+
+
+def test_metadata_filter_selective_and_broad_paths_agree():
+    client = FakeEmbeddingClient()
+    entries = [
+        (f"k{i}", f"value {i}", {"type": "docstring" if i % 10 == 0 else "code", "tags": ["a", f"t{i % 3}"]})
+        for i in range(100)
+    ]
+    selective = VectorMemoryStore(embed_model="fake", dim=8, client=client, filter_selectivity=1.0)
+    broad = VectorMemoryStore(embed_model="fake", dim=8, client=client, filter_selectivity=0.0)
+    for store in (selective, broad):
+        store.add_many(entries)
+        store.delete("k20")
+
+    for store in (selective, broad):
+        hits = store.query("value 55", top_k=5, filter={"type": "docstring"})
+        assert len(hits) == 5
+        assert all(meta["type"] == "docstring" for _, meta in hits)
+        assert "k20" not in {key for key, _ in hits}
+
+        hits = store.query("value 55", top_k=50, filter={"type": "docstring", "tags": ["t1", "t2"]})
+        assert sorted(key for key, _ in hits) == ["k10", "k40", "k50", "k70", "k80"]
+
+        assert store.query("value 1", filter={"type": "missing"}) == []
+
+    assert selective.query("value 55", top_k=5, filter={"type": "docstring"}) == \
+        broad.query("value 55", top_k=5, filter={"type": "docstring"})
+
+
+def test_free_text_is_not_indexed_and_postings_stay_flat_under_churn():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, filter_selectivity=1.0)
+    store.add_many((f"k{i}", f"value {i}", None) for i in range(50))
+    store.add("doc", "long", {"type": "doc", "title": "x" * 100})
+    assert set(store._postings) == {("type", "doc")}
+    # unindexed fields are still filterable, by scanning
+    assert [key for key, _ in store.query("value 3", filter={"content": "value 3"})] == ["k3"]
+
+    for round_ in range(20):
+        store.upsert_many((f"k{i}", f"value {i}", {"type": f"t{i % 2}"}) for i in range(50))
+    assert sum(len(ids) for ids in store._postings.values()) == 51
+
+    assert [key for key, _ in store.query("long", filter={"title": "x" * 100})] == ["doc"]
+    assert len(store.query("value 3", top_k=3, filter={"type": "t1"})) == 3
+
+
+def test_query_with_scores_per_metric_and_min_score():
+    client = FakeEmbeddingClient()
+    entries = [(f"k{i}", f"value {i}", None) for i in range(20)]
+
+    l2 = VectorMemoryStore(embed_model="fake", dim=8, client=client)
+    l2.add_many(entries)
+    key, _, score = l2.query_with_scores("value 4", top_k=1)[0]
+    assert key == "k4" and score == 1.0
+
+    cosine = VectorMemoryStore(embed_model="fake", dim=8, client=client, metric="cosine", index_type="hnsw")
+    cosine.add_many(entries)
+    hits = cosine.query_with_scores("value 4", top_k=5)
+    assert hits[0][0] == "k4" and abs(hits[0][2] - 1.0) < 1e-5
+    scores = [score for _, _, score in hits]
+    assert scores == sorted(scores, reverse=True) and all(-1.0 <= s <= 1.0 + 1e-5 for s in scores)
+
+    # unrelated memories are cut off instead of padding the result
+    assert [key for key, _, _ in cosine.query_with_scores("value 4", top_k=5, min_score=0.99)] == ["k4"]
+    assert cosine.query("value 4", top_k=2) == [(key, meta) for key, meta, _ in hits[:2]]
+
+
+def test_query_many_embeds_once_and_matches_query():
+    client = FakeEmbeddingClient()
+    store = VectorMemoryStore(embed_model="fake", dim=8, client=client, compact_threshold=1.0)
+    store.add_many((f"k{i}", f"value {i}", {"i": i}) for i in range(30))
+    for i in range(0, 30, 3):
+        store.delete(f"k{i}")
+
+    queries = ["value 1", "value 3", "value 17"]
+    client.calls.clear()
+    batched = store.query_many(queries, top_k=4)
+
+    assert client.calls == [queries]
+    assert batched == [store.query(q, top_k=4) for q in queries]
+    assert all(len(hits) == 4 for hits in batched)
+    assert store.query_many([]) == []